@@ -0,0 +1,31 @@
+import streamlit as st
+import genai1
+import genai2
+import genai3
+
+
+# Page entry points: the config is set once here, so the pages skip their own set_page_config
+def single_report_page():
+    genai1.main(configure_page=False)
+
+
+def multiple_reports_page():
+    genai3.main(configure_page=False)
+
+
+# Function to run every tool as one multipage app in a single server process, sharing loaded models and caches
+def main():
+    st.set_page_config(page_title="Cybersecurity Audit Analyzer", page_icon="🔍", layout="wide")
+
+    single_page = st.Page(single_report_page, title="Single Audit Report", icon="📄", url_path="single-report")
+    multiple_page = st.Page(multiple_reports_page, title="Multiple Audit Reports", icon="📚", url_path="multiple-reports")
+
+    def landing_page():
+        genai2.main(single_page, multiple_page)
+
+    home_page = st.Page(landing_page, title="Home", icon="🏠", default=True)
+    st.navigation([home_page, single_page, multiple_page]).run()
+
+
+if __name__ == '__main__':
+    main()
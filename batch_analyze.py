@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import argparse
+import genai3
+from llm_executor import CompletionExecutor, DEFAULT_CONCURRENCY
+from pdf_extraction import load_document, load_documents, DocumentError, DEFAULT_PDF_WORKERS
+from results_io import analysis_to_rows, write_results, detect_format, RESULT_FORMATS
+
+
+# Function to parse the command line
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyze a directory of cybersecurity audit reports (PDF) without the Streamlit UI."
+    )
+    parser.add_argument("input_dir", help="Directory containing the PDF reports (searched recursively)")
+    parser.add_argument("output", help="Results file (.jsonl, .csv or .parquet)")
+    parser.add_argument("--format", choices=RESULT_FORMATS, help="Output format (default: from the output extension)")
+    parser.add_argument("--checkpoint", help="Checkpoint file of completed (report, question) results "
+                                             "(default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--question", action="append", default=[], help="Extra question to ask (repeatable)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_PDF_WORKERS, help="Processes used for PDF parsing")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent LLM requests")
+    parser.add_argument("--batch-size", type=int, default=32, help="Reports parsed and analyzed per batch")
+    parser.add_argument("--per-question", action="store_true", help="Use one LLM call per question instead of batched mode")
+    return parser.parse_args(argv)
+
+
+# Function to list the PDFs under a directory in a stable order
+def list_pdfs(directory):
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+    return sorted(paths)
+
+
+# Function to read the rows already completed by an earlier (possibly crashed) run
+def load_checkpoint(path):
+    rows = []
+    torn = False
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    torn = True  # a partial final line from a crash; everything before it is intact
+                    break
+    if torn:
+        # Rewrite without the partial line (atomically) so new rows append cleanly
+        with open(path + ".tmp", 'w', encoding='utf-8') as handle:
+            for row in rows:
+                handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+        os.replace(path + ".tmp", path)
+    return rows
+
+
+# Function to append completed rows to the checkpoint and flush them to disk
+def append_checkpoint(path, rows):
+    with open(path, 'a', encoding='utf-8') as handle:
+        for row in rows:
+            handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+# Function to load a batch of reports, skipping (with a warning) any that are unreadable or exceed the
+# ingestion budgets; one bad file makes the batch fall back to loading its files one at a time
+def load_batch(paths, workers):
+    try:
+        return paths, load_documents(paths, max_workers=workers)
+    except DocumentError:
+        kept, records = [], []
+        for path in paths:
+            try:
+                records.append(load_document(path))
+            except DocumentError as e:
+                print(f"Skipping {path}: {e}", file=sys.stderr)
+                continue
+            kept.append(path)
+        return kept, records
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = detect_format(args.output, args.format)
+    checkpoint = args.checkpoint or args.output + ".checkpoint.jsonl"
+    questions = genai3.KEY_DECISION_QUESTIONS + args.question
+    executor = CompletionExecutor(max_concurrency=args.concurrency)
+
+    paths = list_pdfs(args.input_dir)
+    rows = load_checkpoint(checkpoint)
+    done = {(row['report'], row['doc_id'], row['question']) for row in rows}
+    print(f"{len(paths)} reports, {len(done)} results already checkpointed", file=sys.stderr)
+
+    reports = set()  # (name, doc_id) of every report loaded in this run
+    for start in range(0, len(paths), args.batch_size):
+        batch, records = load_batch(paths[start:start + args.batch_size], args.workers)
+        if not batch:
+            continue
+        names = [os.path.relpath(path, args.input_dir) for path in batch]
+        texts = [record['text'] for record in records]
+        doc_ids = [record['doc_id'] for record in records]
+        reports.update(zip(names, doc_ids))
+
+        risk_stats = genai3.classify_risks(texts, [record['page_offsets'] for record in records])
+        detailed_results, _ = genai3.analyze_reports(texts, names, risk_stats=risk_stats)
+
+        # Group reports by the questions they still need, so each group is one concurrent analysis call
+        groups = {}
+        for i, (name, doc_id) in enumerate(zip(names, doc_ids)):
+            pending = tuple(question for question in questions if (name, doc_id, question) not in done)
+            if pending:
+                groups.setdefault(pending, []).append(i)
+
+        for pending, indexes in groups.items():
+            analysis_results = genai3.analyze_reports_with_content(
+                [texts[i] for i in indexes], list(pending), [names[i] for i in indexes],
+                doc_ids=[doc_ids[i] for i in indexes], executor=executor, batched=not args.per_question
+            )
+            new_rows = analysis_to_rows(analysis_results, detailed_results, [doc_ids[i] for i in indexes])
+            append_checkpoint(checkpoint, new_rows)
+            rows.extend(new_rows)
+            done.update((row['report'], row['doc_id'], row['question']) for row in new_rows)
+
+        print(f"Analyzed {min(start + args.batch_size, len(paths))}/{len(paths)} reports", file=sys.stderr)
+
+    # The checkpoint also holds rows for reports since removed or replaced and for questions no longer asked
+    rows = [row for row in rows if (row['report'], row['doc_id']) in reports and row['question'] in questions]
+    write_results(rows, args.output, fmt)
+    print(f"Wrote {len(rows)} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
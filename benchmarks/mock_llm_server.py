@@ -0,0 +1,146 @@
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTION_LINE = re.compile(r"^(\d+)\. ", re.MULTILINE)
+
+
+# Function to estimate tokens the way the app does when tiktoken is unavailable
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+# Function to produce a deterministic fake answer for a chat request
+def fake_answer(messages):
+    prompt = messages[-1]['content'] if messages else ""
+    digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+    if "numbered question" in prompt:
+        count = len(QUESTION_LINE.findall(prompt.split("Report:", 1)[0]))
+        answers = []
+        for i in range(1, count + 1):
+            verdict = "yes" if (digest >> i) & 1 else "no"
+            answers.append({"id": i, "verdict": verdict, "evidence": "Synthetic evidence." if verdict == "yes" else ""})
+        return json.dumps({"answers": answers})
+    if "Answer with 'yes' or 'no'" in prompt:
+        return "yes, the report describes this control." if digest & 1 else "no"
+    return "This is a synthetic response from the mock LLM server."
+
+
+class MockLLMServer:
+    """Local OpenAI-compatible ``/v1/chat/completions`` endpoint with configurable latency.
+
+    Every request sleeps ``latency`` seconds (plus up to ``jitter``), including
+    streamed ones, and the server keeps running totals of requests and tokens.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.05, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.stats = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_base(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _record(self, prompt_tokens, completion_tokens):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['prompt_tokens'] += prompt_tokens
+            self.stats['completion_tokens'] += completion_tokens
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/stats'):
+                    self._send_json(server.stats)
+                else:
+                    self._send_json({"error": {"message": "not found"}}, status=404)
+
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send_json({"error": {"message": "not found"}}, status=404)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+                messages = request.get('messages', [])
+                content = fake_answer(messages)
+                prompt_tokens = sum(estimate_tokens(message.get('content', '')) for message in messages)
+                completion_tokens = estimate_tokens(content)
+                time.sleep(server._record(prompt_tokens, completion_tokens))
+
+                base = {"id": "chatcmpl-mock", "created": int(time.time()), "model": request.get('model', 'mock')}
+                if request.get('stream'):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for word in re.findall(r"\S+\s*", content):
+                        chunk = dict(base, object="chat.completion.chunk",
+                                     choices=[{"index": 0, "delta": {"content": word}, "finish_reason": None}])
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    return
+
+                self._send_json(dict(
+                    base,
+                    object="chat.completion",
+                    choices=[{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    usage={"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                           "total_tokens": prompt_tokens + completion_tokens}
+                ))
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock chat completion server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Extra random latency, up to this many seconds")
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.jitter).start()
+    print(f"Mock LLM server listening on {server.api_base}", file=sys.stderr)
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import io
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import statistics
+
+from benchmarks.synthetic_corpus import generate_corpus
+from benchmarks.mock_llm_server import MockLLMServer
+
+
+# Function to compute a percentile (nearest rank) of a list of durations
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+# Function to time a callable once per item, returning the per-item durations
+def time_each(fn, items):
+    durations = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+# Function to wrap a PDF's bytes the way Streamlit hands over an upload: an in-memory buffer with a name
+def as_upload(path, data):
+    upload = io.BytesIO(data)
+    upload.name = os.path.basename(path)
+    return upload
+
+
+# Function to summarize the timings of one stage. Stages timed only as a whole (no per-item durations)
+# report their total and throughput, with no percentiles.
+def stage_result(stage, reports, pages, durations, items, total=None):
+    total = total if total is not None else sum(durations)
+    return {
+        'stage': stage,
+        'reports': reports,
+        'pages': pages,
+        'items': items,
+        'total_s': total,
+        'throughput_per_s': items / total if total else float('inf'),
+        'p50_s': statistics.median(durations) if durations else None,
+        'p95_s': percentile(durations, 95) if durations else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the audit-report pipeline offline on a synthetic corpus.")
+    parser.add_argument("--reports", type=int, nargs="+", default=[1, 5, 20], help="Report counts to test")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200], help="Pages per report to test")
+    parser.add_argument("--keyword-density", type=float, default=0.05, help="Fraction of sentences with risk keywords")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock LLM latency per request, in seconds")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "cyberinsights-bench-corpus"))
+    parser.add_argument("--stages", nargs="+", default=["extract", "classify", "analyze", "pdf"],
+                        choices=["extract", "classify", "summarize", "analyze", "pdf"],
+                        help="Stages to run (summarize loads BART and is off by default)")
+    parser.add_argument("--font", help="TTF font for the PDF export stage (defaults to CYBERINSIGHTS_PDF_FONT, else core Helvetica)")
+    parser.add_argument("--json", help="Write the results to this JSON file, for comparing commits")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Isolate every cache from the user's real one, so each run starts cold
+    os.environ["CYBERINSIGHTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="cyberinsights-bench-")
+    server = MockLLMServer(latency=args.latency).start()
+
+    from llm_client import llm_client
+    llm_client.configure_backend(api_base=server.api_base, api_key="mock")
+
+    import genai3
+    from pdf_extraction import read_file_bytes, parse_upload, load_documents, document_store
+    from pdf_export import ChatPdfExporter, FONT_PATH
+
+    results = []
+    try:
+        for pages in args.pages:
+            for reports in args.reports:
+                paths = generate_corpus(args.corpus_dir, reports, pages, args.keyword_density)
+                uploads = [as_upload(path, read_file_bytes(path)) for path in paths]
+
+                if "extract" in args.stages:
+                    # Uploads go through the app's path: spooled to a temporary file and parsed via a memory map
+                    durations = time_each(parse_upload, uploads)
+                    results.append(stage_result("extract", reports, pages, durations, reports))
+                    document_store.clear()
+                    start = time.perf_counter()
+                    load_documents(paths)
+                    results.append(stage_result("extract_parallel", reports, pages, [], reports,
+                                                total=time.perf_counter() - start))
+
+                records = load_documents(paths)
+                texts = [record['text'] for record in records]
+
+                if "classify" in args.stages:
+                    durations = time_each(genai3.classify_risk, texts)
+                    results.append(stage_result("classify_risk", reports, pages, durations, reports))
+
+                if "summarize" in args.stages:
+                    from model_registry import get_summarization_model
+                    from summarizer import summarize_document
+                    tokenizer, model = get_summarization_model()
+                    durations = time_each(lambda text: summarize_document(text, tokenizer, model), texts)
+                    results.append(stage_result("summarize_text", reports, pages, durations, reports))
+
+                if "analyze" in args.stages:
+                    genai3.answer_cache.clear()
+                    before = dict(server.stats)
+                    questions = genai3.KEY_DECISION_QUESTIONS
+                    names = [os.path.basename(path) for path in paths]
+                    start = time.perf_counter()
+                    genai3.analyze_reports_with_content(texts, questions, names,
+                                                        doc_ids=[record['doc_id'] for record in records])
+                    total = time.perf_counter() - start
+                    result = stage_result("analyze_reports_with_content", reports, pages, [], reports * len(questions),
+                                          total=total)
+                    for key in ('requests', 'prompt_tokens', 'completion_tokens'):
+                        result[key] = server.stats[key] - before[key]
+                    results.append(result)
+
+                if "pdf" in args.stages:
+                    font = args.font or FONT_PATH
+                    if font and not os.path.exists(font):
+                        print(f"Skipping pdf stage: font not found at {font} (use --font)", file=sys.stderr)
+                    else:
+                        history = []
+                        for i in range(reports * 10):
+                            history.append({"role": "user", "content": f"Question {i} about the audit?"})
+                            history.append({"role": "assistant", "content": texts[i % len(texts)][:1500]})
+                        durations = time_each(lambda n: ChatPdfExporter(font).render(history[:n]),
+                                              range(2, len(history) + 1, 2))
+                        results.append(stage_result("generate_pdf", reports, pages, durations, len(durations)))
+                        # Re-downloading an unchanged chat is served from the exporter's cached bytes
+                        exporter = ChatPdfExporter(font)
+                        exporter.render(history)
+                        durations = time_each(lambda _: exporter.render(history), range(len(history) // 2))
+                        results.append(stage_result("generate_pdf_cached", reports, pages, durations, len(durations)))
+    finally:
+        server.stop()
+
+    print(f"{'stage':<30}{'reports':>8}{'pages':>7}{'items/s':>10}{'total s':>9}{'p50 s':>9}{'p95 s':>9}{'requests':>10}{'tokens':>10}")
+    for result in results:
+        tokens = result.get('prompt_tokens', 0) + result.get('completion_tokens', 0)
+        p50, p95 = (f"{result[key]:.3f}" if result[key] is not None else "-" for key in ('p50_s', 'p95_s'))
+        print(f"{result['stage']:<30}{result['reports']:>8}{result['pages']:>7}{result['throughput_per_s']:>10.2f}"
+              f"{result['total_s']:>9.3f}{p50:>9}{p95:>9}{result.get('requests', ''):>10}{tokens or '':>10}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
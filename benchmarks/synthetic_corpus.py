@@ -0,0 +1,62 @@
+import os
+import random
+from fpdf import FPDF
+
+# Filler vocabulary for the body text of synthetic audit reports
+FILLER_SENTENCES = [
+    "The audit team reviewed the access control procedures for production systems.",
+    "Management provided documentation describing the change management workflow.",
+    "Network segmentation between corporate and operational environments was assessed.",
+    "Backup jobs are scheduled nightly and retained according to the retention policy.",
+    "Security awareness training records were sampled for the period under review.",
+    "Vendor onboarding includes a questionnaire covering information security controls.",
+    "Incident response roles are documented in the security operations runbook.",
+    "Encryption settings for databases and storage accounts were inspected.",
+    "Multi-factor authentication is enforced for remote and privileged access.",
+    "Vulnerability scans are performed monthly and tracked to remediation.",
+]
+
+# Risk phrases injected at the requested density (taken from the genai3 keyword tiers)
+RISK_PHRASES = [
+    "A critical vulnerability was identified on an internet-facing server.",
+    "The review noted a potential vulnerability in legacy authentication.",
+    "Firewall misconfiguration allowed broader access than documented.",
+    "An isolated incident of unauthorized access was contained.",
+    "Password weaknesses were observed in service accounts.",
+    "A minor compliance gap was found in log retention.",
+    "Several hosts were unpatched beyond the agreed window.",
+]
+
+
+# Function to write one synthetic audit report PDF with a header, footer and page numbers on every page
+def write_report(path, pages, keyword_density=0.05, sentences_per_page=25, seed=None):
+    rng = random.Random(seed)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=False)
+    pdf.set_font("Helvetica", size=10)
+    for page in range(1, pages + 1):
+        pdf.add_page()
+        pdf.cell(0, 8, text="ACME Corp - Cybersecurity Audit Report - CONFIDENTIAL", new_x="LMARGIN", new_y="NEXT", align='C')
+        body = []
+        for _ in range(sentences_per_page):
+            if rng.random() < keyword_density:
+                body.append(rng.choice(RISK_PHRASES))
+            else:
+                body.append(rng.choice(FILLER_SENTENCES))
+        pdf.multi_cell(0, 5, text=" ".join(body))
+        pdf.set_y(-15)
+        pdf.cell(0, 8, text=f"Page {page} of {pages}", align='C')
+    pdf.output(path)
+    return path
+
+
+# Function to generate a corpus of reports and return their paths
+def generate_corpus(directory, count, pages, keyword_density=0.05, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"report_{pages:04d}p_{i:04d}.pdf")
+        if not os.path.exists(path):
+            write_report(path, pages, keyword_density, seed=seed * 100003 + pages * 1009 + i)
+        paths.append(path)
+    return paths
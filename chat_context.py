@@ -0,0 +1,102 @@
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # tiktoken is optional; fall back to the usual ~4 characters per token estimate
+    _encoding = None
+
+# Token budgets for each chat request
+RECENT_TURNS_TOKENS = 1500
+ROLLING_SUMMARY_TOKENS = 300
+PINNED_SUMMARY_TOKENS = 400
+# Turns that slid out of the verbatim window are folded into the rolling summary this many at a time
+FOLD_BATCH_TURNS = 6
+
+
+# Function to count (or estimate) the tokens in a piece of text
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+# Function to cut text down to a token budget
+def truncate_to_tokens(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+class ChatContextManager:
+    """Builds a bounded message list for each chat turn.
+
+    The most recent turns are kept verbatim up to ``recent_tokens``; older turns
+    are folded, once, into a rolling summary produced by ``summarize`` and kept
+    in ``state`` (e.g. ``st.session_state``). A pinned system context such as the
+    report summary is sent in compact form on every turn, so the request size
+    stays flat however long the conversation runs.
+
+    Building a request never calls ``summarize``. Callers run ``fold`` after an
+    answer has been shown, and it only summarizes once ``fold_turns`` turns have
+    left the window; until then those turns are still sent verbatim.
+    """
+
+    def __init__(self, summarize, recent_tokens=RECENT_TURNS_TOKENS, summary_tokens=ROLLING_SUMMARY_TOKENS,
+                 pinned_tokens=PINNED_SUMMARY_TOKENS, fold_turns=FOLD_BATCH_TURNS):
+        self.summarize = summarize
+        self.recent_tokens = recent_tokens
+        self.summary_tokens = summary_tokens
+        self.pinned_tokens = pinned_tokens
+        self.fold_turns = fold_turns
+
+    # Function to return the conversational turns (the pinned report summary is sent separately)
+    def turns(self, history):
+        return [entry for entry in history if entry.get('kind') != 'report_summary']
+
+    # Function to return how many turns the rolling summary covers, resetting it if the history was cleared
+    def folded_upto(self, turns, state):
+        if state.get('chat_summary_upto', 0) > len(turns):
+            state['chat_summary'], state['chat_summary_upto'] = "", 0
+        return state.get('chat_summary_upto', 0)
+
+    # Function to find where the verbatim window starts among the conversational turns
+    def window_start(self, turns):
+        used = 0
+        start = len(turns)
+        while start > 0:
+            cost = count_tokens(turns[start - 1]['content'])
+            if used + cost > self.recent_tokens and start < len(turns):
+                break
+            used += cost
+            start -= 1
+        return start
+
+    # Function to fold turns that slid out of the window into the rolling summary, in batches of fold_turns.
+    # Call it after the answer has been shown, so the summary call never delays the next first token.
+    def fold(self, history, state):
+        turns = self.turns(history)
+        folded = self.folded_upto(turns, state)
+        window_start = self.window_start(turns)
+        if window_start - folded >= self.fold_turns:
+            summary = self.summarize(state.get('chat_summary', ""), turns[folded:window_start])
+            state['chat_summary'] = truncate_to_tokens(summary, self.summary_tokens)
+            state['chat_summary_upto'] = window_start
+        return state.get('chat_summary', "")
+
+    # Function to build the messages for a new prompt from the existing history (without the prompt itself)
+    def build_messages(self, history, prompt, state, pinned=None, extra_context=None):
+        turns = self.turns(history)
+        # Every turn the rolling summary does not cover yet is sent verbatim, none that it does
+        start = self.folded_upto(turns, state)
+        summary = state.get('chat_summary', "")
+
+        messages = []
+        if pinned:
+            messages.append({"role": "system", "content": f"Summary of the uploaded audit report: {truncate_to_tokens(pinned, self.pinned_tokens)}"})
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+        messages.extend(extra_context or [])
+        messages.extend({"role": entry['role'], "content": entry['content']} for entry in turns[start:])
+        messages.append({"role": "user", "content": prompt})
+        return messages
@@ -0,0 +1,130 @@
+import os
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# Chunking and BM25 parameters
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Memory budget for the per-report indexes kept in memory (a 200-page report takes roughly 5 MB)
+MAX_INDEX_CACHE_BYTES = int(os.environ.get("CYBERINSIGHTS_CHUNK_CACHE_BYTES", 256 * 1024 * 1024))
+# Approximate in-memory cost of one chunk's string object and of one (term, count) entry in a chunk
+CHUNK_OVERHEAD_BYTES = 50
+TERM_ENTRY_BYTES = 40
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by does do for from has have how in is it its of on or the there this to
+was were what which with are is any all our their they them these those be been being if into
+""".split())
+
+
+# Function to turn text into lowercase search terms
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class ChunkIndex:
+    """BM25 index over overlapping word windows of one report.
+
+    ``retrieve`` returns the best-scoring chunks for a query, trimmed to a word
+    budget and put back in document order, so prompts carry the relevant
+    passages from anywhere in the report instead of only its first pages.
+    """
+
+    def __init__(self, text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+        words = text.split()
+        step = max(1, chunk_words - overlap)
+        self.chunks = [' '.join(words[start:start + chunk_words])
+                       for start in range(0, max(len(words) - overlap, 1), step)]
+        # Chunks share one string object per term, so repeated terms are not stored once per chunk
+        terms = {}
+        self.term_freqs = [Counter(terms.setdefault(term, term) for term in tokenize(chunk)) for chunk in self.chunks]
+        self.lengths = [sum(freqs.values()) for freqs in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        doc_freqs = Counter()
+        for freqs in self.term_freqs:
+            doc_freqs.update(freqs.keys())
+        total = len(self.chunks)
+        self.idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()}
+        self.size = (sum(len(chunk) + CHUNK_OVERHEAD_BYTES for chunk in self.chunks)
+                     + TERM_ENTRY_BYTES * (sum(len(freqs) for freqs in self.term_freqs) + len(self.idf)))
+
+    # Function to score every chunk against a query, best first
+    def search(self, query):
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scored = []
+        for i, freqs in enumerate(self.term_freqs):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
+
+    # Function to return the most relevant chunks for one or more queries within a word budget
+    def retrieve(self, queries, max_tokens=3000):
+        if isinstance(queries, str):
+            queries = [queries]
+        rankings = [[i for _, i in self.search(query)] for query in queries]
+
+        # Take the next best chunk for each query in turn so every question gets coverage
+        selected, used = [], 0
+        seen = set()
+        for rank in range(max((len(ranking) for ranking in rankings), default=0)):
+            for ranking in rankings:
+                if rank >= len(ranking) or ranking[rank] in seen:
+                    continue
+                i = ranking[rank]
+                size = len(self.chunks[i].split())
+                if used + size > max_tokens:
+                    continue
+                selected.append(i)
+                seen.add(i)
+                used += size
+
+        # Nothing matched: fall back to the start of the report
+        if not selected:
+            for i, chunk in enumerate(self.chunks):
+                size = len(chunk.split())
+                if used + size > max_tokens:
+                    break
+                selected.append(i)
+                used += size
+        return "\n...\n".join(self.chunks[i] for i in sorted(selected))
+
+
+_indexes = OrderedDict()
+_indexes_bytes = 0
+_indexes_lock = threading.Lock()
+
+
+# Function to get (building on first use) the chunk index of a report. Least recently used indexes are
+# dropped once the cached ones exceed MAX_INDEX_CACHE_BYTES; the newest one is always kept.
+def get_chunk_index(doc_id, text):
+    global _indexes_bytes
+    with _indexes_lock:
+        index = _indexes.get(doc_id)
+        if index is not None:
+            _indexes.move_to_end(doc_id)
+            return index
+    # `text` may be a callable, so callers that keep the text compressed only expand it on a miss
+    index = ChunkIndex(text() if callable(text) else text)
+    with _indexes_lock:
+        previous = _indexes.pop(doc_id, None)
+        if previous is not None:
+            _indexes_bytes -= previous.size
+        _indexes[doc_id] = index
+        _indexes_bytes += index.size
+        while _indexes_bytes > MAX_INDEX_CACHE_BYTES and len(_indexes) > 1:
+            _indexes_bytes -= _indexes.popitem(last=False)[1].size
+    return index
@@ -0,0 +1,37 @@
+import os
+import uuid
+import pandas as pd
+import streamlit as st
+from instrumentation import tracer
+
+# Show the sidebar debug panel when CYBERINSIGHTS_DEBUG=1 or the page is opened with ?debug=1
+DEBUG_ENABLED = os.environ.get("CYBERINSIGHTS_DEBUG", "0") == "1"
+
+
+# Function to tag everything traced during this script run with the Streamlit session
+def start_session_trace():
+    if 'trace_session_id' not in st.session_state:
+        st.session_state.trace_session_id = uuid.uuid4().hex[:12]
+    tracer.set_session(st.session_state.trace_session_id)
+    return st.session_state.trace_session_id
+
+
+# Function to render per-stage timings, token usage and cache hits in the sidebar
+def render_debug_panel():
+    if not (DEBUG_ENABLED or st.query_params.get("debug") == "1"):
+        return
+    session_id = st.session_state.get('trace_session_id')
+    with st.sidebar.expander("🛠️ Debug: timings & usage", expanded=False):
+        scope = st.radio("Scope", ["This session", "Whole server"], horizontal=True, key="debug_scope")
+        session = session_id if scope == "This session" else None
+        summary = tracer.summary(session)
+        if summary:
+            df = pd.DataFrame.from_dict(summary, orient='index')
+            df['avg_s'] = df['seconds'] / df['calls']
+            st.dataframe(df.round(3))
+        else:
+            st.caption("Nothing recorded yet.")
+        st.download_button("Download JSON trace", data=tracer.to_json(session), file_name="cyberinsights_trace.json",
+                           mime="application/json", key="debug_trace_json")
+        st.download_button("Download Prometheus metrics", data=tracer.to_prometheus(), file_name="cyberinsights.prom",
+                           mime="text/plain", key="debug_trace_prom")
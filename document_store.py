@@ -0,0 +1,100 @@
+import os
+import json
+import contextlib
+import sqlite3
+import threading
+import time
+import zlib
+
+# Default location and size budget for the on-disk document cache
+DEFAULT_CACHE_DIR = os.environ.get(
+    "CYBERINSIGHTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cyberinsights")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("CYBERINSIGHTS_DOC_CACHE_BYTES", 512 * 1024 * 1024))
+
+
+class DocumentStore:
+    """Disk-backed store of extracted report text keyed by the SHA-256 of the uploaded bytes.
+
+    Each entry holds the (zlib-compressed) text, the character offset at which
+    every page starts and a small metadata dict. Entries are evicted in
+    least-recently-used order once the compressed payloads exceed ``max_bytes``.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "documents.sqlite3")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id TEXT PRIMARY KEY,
+                    text BLOB NOT NULL,
+                    page_offsets TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_last_access ON documents (last_access)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # Function to look up a document and mark it as recently used
+    def get(self, doc_id):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT text, page_offsets, metadata FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE documents SET last_access = ? WHERE doc_id = ?", (time.time(), doc_id))
+        text, page_offsets, metadata = row
+        return {
+            'doc_id': doc_id,
+            'text': zlib.decompress(text).decode('utf-8'),
+            'page_offsets': json.loads(page_offsets),
+            'metadata': json.loads(metadata),
+        }
+
+    # Function to add (or replace) a document and evict old entries over budget
+    def put(self, doc_id, text, page_offsets, metadata=None):
+        blob = zlib.compress(text.encode('utf-8'))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, blob, json.dumps(page_offsets), json.dumps(metadata or {}), len(blob), time.time()),
+            )
+            self._evict(conn)
+        return {'doc_id': doc_id, 'text': text, 'page_offsets': page_offsets, 'metadata': metadata or {}}
+
+    def __contains__(self, doc_id):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM documents WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    # Function to drop least recently used documents until the store fits in max_bytes
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT doc_id, size FROM documents ORDER BY last_access ASC").fetchall()
+        # Always keep the most recently written entry, even if it alone exceeds the budget
+        for doc_id, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            total -= size
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM documents")
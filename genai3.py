@@ -1,294 +1,687 @@
-import time
-import openai
-from collections import defaultdict
-from PyPDF2 import PdfReader
-import streamlit as st
-import plotly.express as px
-import pandas as pd
-from transformers import BartTokenizer, BartForConditionalGeneration
-
-# Set OpenAI API key
-openai.api_key = '****'
-
-# Load the BART summarization model
-tokenizer = BartTokenizer.from_pretrained('facebook/bart-large-cnn')
-model = BartForConditionalGeneration.from_pretrained('facebook/bart-large-cnn')
-
-# Key questions for overall report analysis
-KEY_DECISION_QUESTIONS = [
-    "Is there an incident response plan?",
-    "Is data encrypted at rest and in transit?",
-    "Are there regular cybersecurity training programs?",
-    "Are firewalls and intrusion detection systems in place?",
-    "Is there a disaster recovery plan?",
-    "Does the organization conduct regular vulnerability assessments and penetration testing?",
-    "Is there a patch management policy in place to ensure timely software updates?",
-    "Does the organization implement multi-factor authentication (MFA) for access to sensitive systems?",
-    "Are backups regularly tested for restoration, and are they stored securely?",
-    "Are third-party vendors and partners evaluated for cybersecurity risks?",
-    "Is Recent Audit is conducted?"
-]
-
-# Risk classification function using keyword matching
-def classify_risk(content):
-    high_risk_keywords = [
-        "critical", "severe", "high risk", "breach", "compromise", "unauthorized access",
-        "exploitation", "major vulnerability", "data exfiltration", "incident", "unpatched", "unmitigated"
-    ]
-    medium_risk_keywords = [
-        "moderate", "medium risk", "potential vulnerability", "exposure", "configuration issues",
-        "insecure protocols", "firewall misconfiguration", "audit finding", "password weaknesses"
-    ]
-    low_risk_keywords = [
-        "low risk", "minor", "non-critical", "low priority", "compliance gap", "misconfigured settings",
-        "isolated incident", "best practices not followed", "limited vulnerability"
-    ]
-
-    content_lower = content.lower()
-
-    if any(word in content_lower for word in high_risk_keywords):
-        return 'High'
-    elif any(word in content_lower for word in medium_risk_keywords):
-        return 'Medium'
-    elif any(word in content_lower for word in low_risk_keywords):
-        return 'Low'
-    else:
-        return 'No Risk Detected'
-
-# Function to extract text from PDF files
-def extract_text_from_pdf(file):
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
-
-# Function to analyze the reports and return detailed results
-def analyze_reports(texts, file_names):
-    detailed_results = []
-    total_risks = {'Low': 0, 'Medium': 0, 'High': 0, 'No Risk Detected': 0}
-
-    for i, text in enumerate(texts):
-        risk_level = classify_risk(text)
-        detailed_results.append({
-            'PDF Name': file_names[i],
-            'Risk Detected': 'Yes' if risk_level in ['Low', 'Medium', 'High'] else 'No',
-            'Risk Level': risk_level
-        })
-        total_risks[risk_level] += 1
-
-    return detailed_results, total_risks
-
-# Function to analyze the reports and return content related to each key question
-def analyze_reports_with_content(texts, questions, pdf_names):
-    analysis_results = defaultdict(lambda: {'yes': [], 'no': [], 'content': defaultdict(list)})
-
-    for pdf_name, text in zip(pdf_names, texts):
-        truncated_text = truncate_text(text)
-
-        for question in questions:
-            prompt = f"Does the following report mention '{question}'? Answer with 'yes' or 'no'. If yes, extract the relevant content.\n\nReport: {truncated_text}"
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500,
-                temperature=0
-            )
-            answer = response['choices'][0]['message']['content'].strip().lower()
-
-            if 'yes' in answer:
-                analysis_results[question]['yes'].append(pdf_name)
-                analysis_results[question]['content'][pdf_name].append(answer)  # Store relevant content
-            else:
-                analysis_results[question]['no'].append(pdf_name)
-
-    return analysis_results
-
-# Function to truncate long text to fit the model's token limit
-def truncate_text(text, max_tokens=3000):
-    tokens = text.split()
-    if len(tokens) > max_tokens:
-        return ' '.join(tokens[:max_tokens])
-    return text
-
-# Function to generate an advanced interactive bar chart using Plotly
-def generate_plotly_bar_chart_for_question(question, analysis_results, pdf_names):
-    common_pdf_names = [f"Report {i+1}" for i in range(len(pdf_names))]
-   
-    results = analysis_results[question]
-    yes_counts = [1 if pdf_name in results['yes'] else 0 for pdf_name in pdf_names]
-    no_counts = [1 if pdf_name in results['no'] else 0 for pdf_name in pdf_names]
-
-    data = pd.DataFrame({
-        'Common PDF Name': common_pdf_names,
-        'Actual PDF Name': pdf_names,
-        'Yes': yes_counts,
-        'No': no_counts
-    })
-
-    data_melted = data.melt(['Common PDF Name', 'Actual PDF Name'], var_name='Response', value_name='Count')
-
-    fig = px.bar(
-        data_melted,
-        x='Count',
-        y='Common PDF Name',
-        color='Response',
-        orientation='h',
-        title=f"Analysis of '{question}' Across Reports",
-        text='Response',
-        hover_data={'Actual PDF Name': True},
-        color_discrete_map={'Yes': '#4CAF50', 'No': '#F44336'}
-    )
-
-    fig.update_layout(
-        xaxis_title="Count",
-        yaxis_title="Report",
-        legend_title="Response",
-        height=400
-    )
-
-    st.plotly_chart(fig)
-
-# Function to display relevant content for the selected question
-def display_relevant_content_for_question(question, analysis_results, pdf_names):
-    common_pdf_names = [f"Report {i+1}" for i in range(len(pdf_names))]
-
-    st.markdown(f"### Relevant Content for '{question}'")
-   
-    for idx, pdf_name in enumerate(pdf_names):
-        common_name = common_pdf_names[idx]
-        if pdf_name in analysis_results[question]['yes']:
-            st.markdown(f"**{common_name}**")
-            for content in analysis_results[question]['content'][pdf_name]:
-                with st.expander(f"View content from {common_name}", expanded=True):
-                    st.markdown(content)
-
-# Main Streamlit app
-def main():
-    st.set_page_config(page_title="Cybersecurity Audit Analyzer", page_icon="🔍", layout="wide")
-
-    st.markdown("""
-    <style>
-    .title-clean {
-        font-family: 'Helvetica Neue', sans-serif;
-        font-size: 32px;
-        color: #214cce;
-        font-weight: bold;
-        text-align: center;
-    }
-    .subtitle-clean {
-        font-family: 'Arial', sans-serif;
-        font-size: 20px;
-        color: #000000;
-        font-weight: bold;
-        text-align: center;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-    st.markdown('<h2 class="title-clean">CYBERSECURITY MULTIPLE AUDIT REPORT ANALYZER</h2>', unsafe_allow_html=True)
-    st.markdown('<h5 class="subtitle-clean">Upload your reports to analyze key cybersecurity compliance questions and risk levels.</h5>', unsafe_allow_html=True)
-    
-
-    with st.sidebar:
-        st.markdown("<h2 style='color: #214cce;'> 🛡️ Audit Report Tools</h2>", unsafe_allow_html=True)
-        uploaded_files = st.file_uploader("📄 Upload Cybersecurity Audit Reports (PDF)", type=["pdf"], accept_multiple_files=True)
-        st.markdown("### Enter Custom Questions:")
-        user_question = st.text_input("Type your question here")
-    st.sidebar.image('E:\\Adarsh\\AI\\ChatwithPDF\\CHAT_WITH_PDF\\Files\\photo_2024-10-09_01-13-06-Vy0Uc9P2e-transformed.png', use_column_width=True)
-
-
-    if uploaded_files:
-        st.success("Files uploaded successfully!")
-        file_names = [file.name for file in uploaded_files]
-        report_texts = [extract_text_from_pdf(file) for file in uploaded_files]
-
-        questions_to_analyze = KEY_DECISION_QUESTIONS.copy()
-        if user_question:
-            questions_to_analyze.append(user_question)
-
-        with st.spinner('⏳ Analyzing reports...'):
-            detailed_results, total_risks = analyze_reports(report_texts, file_names)
-            analysis_results = analyze_reports_with_content(report_texts, questions_to_analyze, file_names)
-
-        tab1, tab2, tab3 = st.tabs(["Risk Distribution", "Compliance Check", "Question-Based Analysis"])
-
-        # Tab 1: Risk Distribution
-        with tab1:
-            st.markdown("### Overall Risk Distribution (Heatmap)")
-            risk_df = pd.DataFrame(detailed_results)
-            risk_levels = ['Low Risk', 'Medium Risk', 'High Risk', 'No Risk Detected']
-            colors = ['#E0F7FA', '#81D4FA', '#0288D1', '#01579B']
-
-            heatmap_fig = px.imshow([[total_risks['Low'], total_risks['Medium'], total_risks['High'], total_risks['No Risk Detected']]],
-                                    labels=dict(x="Risk Level", y="Reports"),
-                                    x=risk_levels,
-                                    color_continuous_scale=colors,
-                                    title="Overall Risk Distribution Heatmap")
-            st.plotly_chart(heatmap_fig)
-
-            st.markdown("### Risk Distribution Data Summary")
-
-            st.table(risk_df)
-            
-
-            # Additional visualization: Compliance vs. Risk correlation (density)
-            st.markdown("### Risk Density Map")
-            
-            density_data = {
-                'Risk Level': ['Low', 'Medium', 'High', 'No Risk Detected'],
-                'Count': [total_risks['Low'], total_risks['Medium'], total_risks['High'], total_risks['No Risk Detected']]
-            }
-
-            density_df = pd.DataFrame(density_data)
-
-            # Density plot
-            density_fig = px.density_heatmap(density_df, x='Risk Level', y='Count',
-                                            title='Risk Distribution Density Map', nbinsx=10, nbinsy=10)
-            st.plotly_chart(density_fig)
-
-        # Tab 2: Compliance Check
-        # Tab 2: Compliance Check
-        with tab2:
-            st.markdown("### Compliance Check Results (Yes/No)")
-
-            # Modify compliance data: If any risk is detected (Low, Medium, High), mark as 'Yes' for compliance issues
-            compliance_data = {
-                'Category': ['Yes', 'No'],
-                'Count': [
-                    sum([1 for res in detailed_results if res['Risk Level'] in ['Low', 'Medium', 'High']]),  # Yes: Risk detected
-                    sum([1 for res in detailed_results if res['Risk Level'] == 'No Risk Detected'])           # No: No risk detected
-                ]
-            }
-
-            compliance_df = pd.DataFrame(compliance_data)
-
-            # Create a Donut Chart for compliance (Yes/No)
-            donut_fig = px.pie(compliance_df, values='Count', names='Category', hole=0.4,
-                            title='Compliance (Yes/No) Donut Chart',
-                            color_discrete_map={'Yes': '#4CAF50', 'No': '#F44336'})
-            st.plotly_chart(donut_fig)
-
-            # Show compliance data summary as a table
-            st.markdown("### Compliance Data Summary (Yes/No)")
-            compliance_detailed_df = pd.DataFrame({
-                'PDF Name': [res['PDF Name'] for res in detailed_results],
-                'Compliance Issue': ['Yes' if res['Risk Level'] in ['Low', 'Medium', 'High'] else 'No' for res in detailed_results]
-            })
-            st.table(compliance_detailed_df)
-
-        # Tab 3: Question-Based Analysis
-        with tab3:
-            st.markdown("### Select a Question to Visualize the Response Across PDFs")
-            combined_questions = KEY_DECISION_QUESTIONS + ([user_question] if user_question else [])
-            selected_question = st.selectbox("Select a question:", combined_questions)
-
-            if selected_question:
-                st.markdown(f"#### Showing Results for: {selected_question}")
-                generate_plotly_bar_chart_for_question(selected_question, analysis_results, file_names)
-                display_relevant_content_for_question(selected_question, analysis_results, file_names)
-        
-        
-
-if __name__ == '__main__':
-    main()
+import os
+import re
+import json
+import math
+import copy
+import openai
+from collections import Counter, defaultdict
+from pdf_extraction import load_documents, file_digest, hash_text, EXTRACTION_VERSION, DocumentError
+from llm_cache import ResponseCache, make_cache_key
+from llm_executor import CompletionExecutor
+from chunk_index import get_chunk_index
+from keyword_matcher import KeywordMatcher, page_for_offset
+from results_io import read_results, rows_to_analysis
+from results_matrix import ResultsMatrix
+from model_registry import get_sentiment_model
+from sentiment import classify_documents
+from instrumentation import instrument, tracer
+from debug_panel import start_session_trace, render_debug_panel
+from job_runner import job_runner, NO_PROGRESS, DONE, FAILED
+from job_panel import render_job_progress
+from static_assets import sidebar_image
+import streamlit as st
+import plotly.express as px
+import pandas as pd
+
+# Set OpenAI API key
+openai.api_key = os.environ.get("OPENAI_API_KEY", '****')
+
+# Model and prompt used for the question-by-report analysis
+ANALYSIS_MODEL = "gpt-3.5-turbo"
+QUESTION_PROMPT_TEMPLATE = "Does the following report mention '{question}'? Answer with 'yes' or 'no'. If yes, extract the relevant content.\n\nReport: {report}"
+
+# Word budgets for the report passages retrieved into each prompt (instead of the first 3000 words)
+QUESTION_CONTEXT_TOKENS = 1000
+BATCH_CONTEXT_TOKENS = 3000
+CONTEXT_STRATEGY = f"bm25:{QUESTION_CONTEXT_TOKENS}:{BATCH_CONTEXT_TOKENS}:extract-v{EXTRACTION_VERSION}"
+
+# Batched mode asks every question about a report in one request and expects strict JSON back
+BATCHED_ANALYSIS = True
+BATCH_PROMPT_TEMPLATE = """Answer each numbered question about the report below.
+Respond with only a JSON object of the form {{"answers": [{{"id": <question number>, "verdict": "yes" or "no", "evidence": "<relevant content extracted from the report, or an empty string>"}}]}} containing exactly one entry per question.
+
+Questions:
+{questions}
+
+Report: {report}"""
+
+# Persistent cache of analysis answers shared across reruns and sessions
+answer_cache = ResponseCache()
+
+# Concurrent, rate-limited engine for the report x question completion calls
+completion_executor = CompletionExecutor()
+
+# Key questions for overall report analysis
+KEY_DECISION_QUESTIONS = [
+    "Is there an incident response plan?",
+    "Is data encrypted at rest and in transit?",
+    "Are there regular cybersecurity training programs?",
+    "Are firewalls and intrusion detection systems in place?",
+    "Is there a disaster recovery plan?",
+    "Does the organization conduct regular vulnerability assessments and penetration testing?",
+    "Is there a patch management policy in place to ensure timely software updates?",
+    "Does the organization implement multi-factor authentication (MFA) for access to sensitive systems?",
+    "Are backups regularly tested for restoration, and are they stored securely?",
+    "Are third-party vendors and partners evaluated for cybersecurity risks?",
+    "Is Recent Audit is conducted?"
+]
+
+# Risk keyword tiers, from highest to lowest; a report takes the highest tier with any hit
+RISK_KEYWORDS = {
+    'High': [
+        "critical", "severe", "high risk", "breach", "compromise", "unauthorized access",
+        "exploitation", "major vulnerability", "data exfiltration", "incident", "unpatched", "unmitigated"
+    ],
+    'Medium': [
+        "moderate", "medium risk", "potential vulnerability", "exposure", "configuration issues",
+        "insecure protocols", "firewall misconfiguration", "audit finding", "password weaknesses"
+    ],
+    'Low': [
+        "low risk", "minor", "non-critical", "low priority", "compliance gap", "misconfigured settings",
+        "isolated incident", "best practices not followed", "limited vulnerability"
+    ]
+}
+
+# One automaton over every tier, so a report is scanned once however many keywords there are
+risk_matcher = KeywordMatcher([keyword for keywords in RISK_KEYWORDS.values() for keyword in keywords])
+keyword_tiers = defaultdict(list)
+for tier, keywords in RISK_KEYWORDS.items():
+    for keyword in keywords:
+        keyword_tiers[keyword.lower()].append(tier)
+
+# Function to count risk keyword hits per keyword, per tier and per page in a single pass
+def scan_risk_keywords(content, page_offsets=None):
+    keyword_hits = defaultdict(Counter)
+    tier_hits = {tier: Counter() for tier in RISK_KEYWORDS}
+    for start, keyword in risk_matcher.find_all(content):
+        page = page_for_offset(start, page_offsets)
+        keyword_hits[keyword][page] += 1
+        for tier in keyword_tiers[keyword]:
+            tier_hits[tier][page] += 1
+
+    level = next((tier for tier in RISK_KEYWORDS if tier_hits[tier]), 'No Risk Detected')
+    return {
+        'level': level,
+        'keywords': {keyword: {'count': sum(pages.values()), 'pages': dict(pages)} for keyword, pages in keyword_hits.items()},
+        'tiers': {tier: {'count': sum(pages.values()), 'pages': dict(pages)} for tier, pages in tier_hits.items()}
+    }
+
+# Risk classification function using keyword matching
+def classify_risk(content):
+    return scan_risk_keywords(content)['level']
+
+# Function to scan a batch of reports, returning the hit statistics for each
+def classify_risks(texts, page_offsets=None):
+    page_offsets = page_offsets or [None] * len(texts)
+    return [scan_risk_keywords(text, offsets) for text, offsets in zip(texts, page_offsets)]
+
+# Function to build the detailed results row of one report from its risk statistics (and sentiment, if classified)
+def detailed_result_row(file_name, stats, sentiment=None):
+    risk_level = stats['level']
+    row = {
+        'PDF Name': file_name,
+        'Risk Detected': 'Yes' if risk_level in ['Low', 'Medium', 'High'] else 'No',
+        'Risk Level': risk_level,
+        'High Hits': stats['tiers']['High']['count'],
+        'Medium Hits': stats['tiers']['Medium']['count'],
+        'Low Hits': stats['tiers']['Low']['count']
+    }
+    if sentiment and sentiment['label']:
+        row['Sentiment'] = f"{sentiment['label']} (uncalibrated score {sentiment['scores'][sentiment['label']]:.0%})"
+    return row
+
+# Function to analyze the reports and return detailed results
+def analyze_reports(texts, file_names, page_offsets=None, risk_stats=None):
+    detailed_results = []
+    total_risks = {'Low': 0, 'Medium': 0, 'High': 0, 'No Risk Detected': 0}
+    risk_stats = risk_stats or classify_risks(texts, page_offsets)
+
+    for file_name, stats in zip(file_names, risk_stats):
+        detailed_results.append(detailed_result_row(file_name, stats))
+        total_risks[stats['level']] += 1
+
+    return detailed_results, total_risks
+
+# Function to flatten per-page tier hits into rows for charting risk density across pages
+def risk_density_by_page(risk_stats, file_names):
+    rows = []
+    for file_name, stats in zip(file_names, risk_stats):
+        for tier, hits in stats['tiers'].items():
+            for page, count in sorted(hits['pages'].items()):
+                rows.append({'PDF Name': file_name, 'Page': page, 'Tier': tier, 'Hits': count})
+    return pd.DataFrame(rows, columns=['PDF Name', 'Page', 'Tier', 'Hits'])
+
+# Function to decide whether a per-question answer is a 'yes' (the leading word, not any mention of 'yes')
+def is_yes_answer(answer):
+    return re.match(r"^\W*yes\b", answer, re.IGNORECASE) is not None
+
+# Function to answer each (report, question) pair with its own completion call
+def answer_questions_individually(tasks, executor, progress=NO_PROGRESS):
+    for task in tasks:
+        task['cache_key'] = make_cache_key(task['doc_id'], task['question'], ANALYSIS_MODEL, QUESTION_PROMPT_TEMPLATE, CONTEXT_STRATEGY)
+        task['answer'] = answer_cache.get(task['cache_key'])
+        tracer.record_cache(task['answer'] is not None)
+        if task['answer'] is not None:
+            progress.advance(1, report=task['pdf_name'])
+
+    # Fan the cache misses out concurrently; the executor returns responses in submission order
+    missing = [task for task in tasks if task['answer'] is None]
+    requests = []
+    for task in missing:
+        # Send only the passages most relevant to this question, from anywhere in the report
+        context = get_chunk_index(task['doc_id'], task['text']).retrieve(task['question'], QUESTION_CONTEXT_TOKENS)
+        prompt = QUESTION_PROMPT_TEMPLATE.format(question=task['question'], report=context)
+        requests.append({
+            'model': ANALYSIS_MODEL,
+            'messages': [{"role": "user", "content": prompt}],
+            'max_tokens': 500,
+            'temperature': 0
+        })
+    def on_done(index):
+        task = missing[index]
+        progress.advance(1, report=task['pdf_name'], message=f"{task['pdf_name']}: {task['question']}")
+
+    for task, response in zip(missing, executor.map(requests, on_done)):
+        task['answer'] = answer_cache.put(task['cache_key'], response['choices'][0]['message']['content'].strip().lower())
+
+    for task in tasks:
+        task['verdict'] = 'yes' if is_yes_answer(task['answer']) else 'no'
+        task['evidence'] = task['answer']
+
+# Function to validate a batched JSON reply, returning {question: {'verdict', 'evidence'}} for the well-formed entries
+def parse_batched_answers(content, questions):
+    start, end = content.find('{'), content.rfind('}')
+    try:
+        payload = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    entries = payload.get('answers') if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return {}
+
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        question_id = entry.get('id')
+        verdict = str(entry.get('verdict', '')).strip().lower()
+        evidence = entry.get('evidence') or ''
+        if not isinstance(question_id, int) or not 1 <= question_id <= len(questions):
+            continue
+        if verdict not in ('yes', 'no') or not isinstance(evidence, str):
+            continue
+        parsed[questions[question_id - 1]] = {'verdict': verdict, 'evidence': evidence.strip()}
+    return parsed
+
+# Function to answer all questions about a report in a single completion call per report
+def answer_questions_batched(tasks, executor, progress=NO_PROGRESS):
+    by_doc = defaultdict(list)
+    for task in tasks:
+        task['cache_key'] = make_cache_key(task['doc_id'], task['question'], ANALYSIS_MODEL, BATCH_PROMPT_TEMPLATE, CONTEXT_STRATEGY)
+        cached = answer_cache.get(task['cache_key'])
+        tracer.record_cache(cached is not None)
+        if cached is not None:
+            task.update(cached)
+            progress.advance(1, report=task['pdf_name'])
+        else:
+            by_doc[task['doc_id']].append(task)
+
+    # One request per report, covering only the questions that are not cached yet
+    doc_tasks = list(by_doc.values())
+    requests = []
+    for pending in doc_tasks:
+        questions = list(dict.fromkeys(task['question'] for task in pending))
+        numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions, start=1))
+        context = get_chunk_index(pending[0]['doc_id'], pending[0]['text']).retrieve(questions, BATCH_CONTEXT_TOKENS)
+        prompt = BATCH_PROMPT_TEMPLATE.format(questions=numbered, report=context)
+        requests.append({
+            'model': ANALYSIS_MODEL,
+            'messages': [{"role": "user", "content": prompt}],
+            'max_tokens': min(4000, 200 * len(questions)),
+            'temperature': 0
+        })
+
+    def on_done(index):
+        pending = doc_tasks[index]
+        progress.advance(len(pending), report=pending[0]['pdf_name'], message=f"{pending[0]['pdf_name']}: {len(pending)} questions")
+
+    for pending, response in zip(doc_tasks, executor.map(requests, on_done)):
+        questions = list(dict.fromkeys(task['question'] for task in pending))
+        answers = parse_batched_answers(response['choices'][0]['message']['content'], questions)
+        for task in pending:
+            if task['question'] in answers:
+                task.update(answer_cache.put(task['cache_key'], answers[task['question']]))
+
+    # Questions the model skipped or answered malformed fall back to per-question calls (already counted as done).
+    # Their answers are also stored under the batched key, so a rerun is served from the cache instead of
+    # asking the batch (and then each question) again.
+    invalid = [task for task in tasks if 'verdict' not in task]
+    if invalid:
+        batched_keys = [task['cache_key'] for task in invalid]
+        answer_questions_individually(invalid, executor)
+        for task, key in zip(invalid, batched_keys):
+            answer_cache.put(key, {'verdict': task['verdict'], 'evidence': task['evidence']})
+
+# Function to answer every question for every report, returning one task per pair with its verdict and evidence
+def answer_report_questions(texts, questions, pdf_names, doc_ids=None, executor=None, batched=BATCHED_ANALYSIS,
+                            progress=NO_PROGRESS):
+    doc_ids = doc_ids or [hash_text(text) for text in texts]
+    executor = executor or completion_executor
+
+    # Answers are cached per (document, question, model, prompt), so reruns are served locally
+    tasks = [
+        {'row': row, 'pdf_name': pdf_name, 'question': question, 'doc_id': doc_id, 'text': text}
+        for row, (pdf_name, doc_id, text) in enumerate(zip(pdf_names, doc_ids, texts))
+        for question in questions
+    ]
+    # One progress step per (report, question) pair
+    for pdf_name in pdf_names:
+        progress.add_steps(len(questions), report=pdf_name)
+    if batched:
+        answer_questions_batched(tasks, executor, progress)
+    else:
+        answer_questions_individually(tasks, executor, progress)
+    return tasks
+
+# Function to analyze the reports and return content related to each key question
+@instrument("analyze_reports_with_content")
+def analyze_reports_with_content(texts, questions, pdf_names, doc_ids=None, executor=None, batched=BATCHED_ANALYSIS,
+                                 progress=NO_PROGRESS):
+    tasks = answer_report_questions(texts, questions, pdf_names, doc_ids, executor, batched, progress)
+    return ResultsMatrix.from_answers(pdf_names, questions, (
+        (task['row'], task['question'], task['verdict'], task['evidence']) for task in tasks
+    ))
+
+# Function to identify an upload across reruns without reading its bytes again
+def upload_key(file):
+    return getattr(file, 'file_id', None) or (getattr(file, 'name', None), getattr(file, 'size', None))
+
+# Function to bring the per-report results kept in `state` (e.g. st.session_state) up to date with the current
+# upload set. Reports are keyed by content hash: only new uploads are read and scanned, each report is only
+# asked the questions it has not answered yet, and total_risks is adjusted for the reports added or removed.
+@instrument("update_report_results")
+def update_report_results(state, files, questions, executor=None, batched=BATCHED_ANALYSIS, sentiment=False,
+                          progress=NO_PROGRESS):
+    reports = state.setdefault('reports', {})  # doc_id -> {'risk_stats': ..., 'answers': {question: (verdict, evidence)}}
+    upload_doc_ids = state.setdefault('upload_doc_ids', {})
+    total_risks = state.setdefault('total_risks', {'Low': 0, 'Medium': 0, 'High': 0, 'No Risk Detected': 0})
+    previous = Counter(state.get('doc_ids', []))
+
+    new_files = [file for file in files if upload_key(file) not in upload_doc_ids]
+    records = {}
+    for file, record in zip(new_files, load_documents(new_files, progress=progress) if new_files else []):
+        upload_doc_ids[upload_key(file)] = record['doc_id']
+        records[record['doc_id']] = record
+    doc_ids = [upload_doc_ids[upload_key(file)] for file in files]
+
+    for doc_id, record in records.items():
+        if doc_id not in reports:
+            # Build the retrieval index and scan risk keywords once per report
+            get_chunk_index(doc_id, record['text'])
+            reports[doc_id] = {'risk_stats': scan_risk_keywords(record['text'], record['page_offsets']), 'answers': {}}
+
+    # Reports already analyzed only need the questions added since (e.g. a new custom question)
+    pending = defaultdict(list)
+    for doc_id in dict.fromkeys(doc_ids):
+        missing = tuple(question for question in questions if question not in reports[doc_id]['answers'])
+        if missing:
+            pending[missing].append(doc_id)
+    # When requested, reports not classified yet get their sentiment from the local model
+    unscored = [doc_id for doc_id in dict.fromkeys(doc_ids) if sentiment and 'sentiment' not in reports[doc_id]]
+    needed = {doc_id for group in pending.values() for doc_id in group} | set(unscored)
+    need_text = [file for file, doc_id in zip(files, doc_ids) if doc_id not in records and doc_id in needed]
+    for record in load_documents(need_text, progress=progress) if need_text else []:
+        records[record['doc_id']] = record
+    names = {doc_id: file.name for file, doc_id in zip(files, doc_ids)}
+    for missing, group in pending.items():
+        texts = [records[doc_id]['text'] for doc_id in group]
+        for task in answer_report_questions(texts, list(missing), [names[doc_id] for doc_id in group], group,
+                                            executor, batched, progress):
+            reports[task['doc_id']]['answers'][task['question']] = (task['verdict'], task['evidence'])
+    if unscored:
+        # Every new report goes through the classifier in the same batched pass
+        progress.add_steps(len(unscored))
+        progress.advance(0, message="classifying sentiment")
+        with tracer.span("classify_sentiment"):
+            tokenizer, model = get_sentiment_model()
+            results = classify_documents([records[doc_id]['text'] for doc_id in unscored], tokenizer, model)
+        progress.advance(len(unscored))
+        for doc_id, result in zip(unscored, results):
+            reports[doc_id]['sentiment'] = result
+
+    # Adjust the risk totals for added and removed uploads instead of recounting every report
+    current = Counter(doc_ids)
+    for doc_id, count in (current - previous).items():
+        total_risks[reports[doc_id]['risk_stats']['level']] += count
+    for doc_id, count in (previous - current).items():
+        total_risks[reports[doc_id]['risk_stats']['level']] -= count
+    for doc_id in set(reports) - set(current):
+        del reports[doc_id]
+    live_uploads = {upload_key(file) for file in files}
+    for key in set(upload_doc_ids) - live_uploads:
+        del upload_doc_ids[key]
+    state['doc_ids'] = doc_ids
+
+    file_names = [file.name for file in files]
+    risk_stats = [reports[doc_id]['risk_stats'] for doc_id in doc_ids]
+    detailed_results = [detailed_result_row(file_name, reports[doc_id]['risk_stats'], reports[doc_id].get('sentiment') if sentiment else None)
+                        for file_name, doc_id in zip(file_names, doc_ids)]
+    analysis_results = ResultsMatrix.from_answers(file_names, questions, (
+        (row, question) + reports[doc_id]['answers'][question]
+        for row, doc_id in enumerate(doc_ids) for question in questions
+    ))
+    return detailed_results, dict(total_risks), analysis_results, risk_stats
+
+# Function to return the content hash of every upload, hashing each upload only once per session (`digests`
+# maps upload keys to hashes and is pruned to the current uploads)
+def upload_digests(digests, files):
+    live = {}
+    for file in files:
+        key = upload_key(file)
+        live[key] = digests[key] if key in digests else file_digest(file)[0]
+    digests.clear()
+    digests.update(live)
+    return [live[upload_key(file)] for file in files]
+
+# Function to tell whether any report still needs extraction, answers or (when requested) sentiment
+def analysis_pending(state, doc_ids, questions, sentiment=False):
+    reports = state.get('reports', {})
+    return any(doc_id not in reports
+               or any(question not in reports[doc_id]['answers'] for question in questions)
+               or (sentiment and 'sentiment' not in reports[doc_id])
+               for doc_id in doc_ids)
+
+# Function run as a background job: bring a copy of a session's per-report results up to date and return it
+def run_report_analysis(state, files, questions, sentiment=False, progress=NO_PROGRESS):
+    update_report_results(state, files, questions, sentiment=sentiment, progress=progress)
+    return state
+
+# Function to return up-to-date results for the uploads, or None while a background job still works on them.
+# Extraction, question answering and sentiment run in a job shared by every session submitting the same
+# reports and questions; the first rerun after the job finishes adopts its results.
+def analyze_uploads(session, files, questions, sentiment=False):
+    doc_ids = upload_digests(st.session_state.upload_digests, files)
+    state = st.session_state.report_analysis
+    if analysis_pending(state, doc_ids, questions, sentiment):
+        args = ('report_analysis', [doc_ids, questions, sentiment, BATCHED_ANALYSIS], run_report_analysis,
+                copy.deepcopy(state), files, questions, sentiment)
+        label = f"Analyzing {len(files)} report{'s' if len(files) != 1 else ''}"
+        job = job_runner.submit(*args, session=session, label=label)
+        if job.status == FAILED and st.button("🔁 Retry analysis"):
+            job = job_runner.submit(*args, session=session, label=label, restart_failed=True)
+        if job.status == FAILED:
+            raise job.error
+        if job.status != DONE:
+            render_job_progress(job)
+            return None
+        # Every session sharing the job adopts its own copy, since later updates modify the state in place
+        state = st.session_state.report_analysis = copy.deepcopy(job.result)
+    job_runner.release(session, 'report_analysis')
+    # Nothing is left to compute here: this only drops removed uploads and applies this session's file names
+    return update_report_results(state, files, questions, sentiment=sentiment)
+
+# Result views, rendered one at a time instead of building every tab on each rerun
+RESULT_VIEWS = ["Risk Distribution", "Compliance Check", "Question-Based Analysis"]
+# Rows per table page and evidence entries per page
+TABLE_PAGE_SIZE = 25
+EVIDENCE_PAGE_SIZE = 10
+# Above this many reports, per-question charts show aggregated yes/no counts instead of one bar per report
+CHART_DETAIL_LIMIT = 50
+
+# Function to generate an advanced interactive bar chart using Plotly
+def generate_plotly_bar_chart_for_question(question, analysis_results, pdf_names):
+    common_pdf_names = [f"Report {i+1}" for i in range(len(pdf_names))]
+
+    # One column of the verdict matrix gives every report's answer at once
+    yes_counts = analysis_results.answers_for(question).to_numpy().astype(int)
+    if len(pdf_names) > CHART_DETAIL_LIMIT:
+        yes_total = int(yes_counts.sum())
+        data = pd.DataFrame({'Response': ['Yes', 'No'], 'Count': [yes_total, len(pdf_names) - yes_total]})
+        fig = px.bar(data, x='Count', y='Response', color='Response', orientation='h', text='Count',
+                     title=f"Analysis of '{question}' Across {len(pdf_names)} Reports",
+                     color_discrete_map={'Yes': '#4CAF50', 'No': '#F44336'})
+        fig.update_layout(xaxis_title="Reports", yaxis_title="Response", legend_title="Response", height=300)
+        st.plotly_chart(fig)
+        return
+    no_counts = 1 - yes_counts
+
+    data = pd.DataFrame({
+        'Common PDF Name': common_pdf_names,
+        'Actual PDF Name': pdf_names,
+        'Yes': yes_counts,
+        'No': no_counts
+    })
+
+    data_melted = data.melt(['Common PDF Name', 'Actual PDF Name'], var_name='Response', value_name='Count')
+
+    fig = px.bar(
+        data_melted,
+        x='Count',
+        y='Common PDF Name',
+        color='Response',
+        orientation='h',
+        title=f"Analysis of '{question}' Across Reports",
+        text='Response',
+        hover_data={'Actual PDF Name': True},
+        color_discrete_map={'Yes': '#4CAF50', 'No': '#F44336'}
+    )
+
+    fig.update_layout(
+        xaxis_title="Count",
+        yaxis_title="Report",
+        legend_title="Response",
+        height=400
+    )
+
+    st.plotly_chart(fig)
+
+# Function to display relevant content for the selected question
+def display_relevant_content_for_question(question, analysis_results, pdf_names):
+    common_pdf_names = [f"Report {i+1}" for i in range(len(pdf_names))]
+
+    st.markdown(f"### Relevant Content for '{question}'")
+
+    # Only reports that answered 'yes' have evidence rows, already in report order; show one page of them
+    evidence_rows = filter_by_report(analysis_results.evidence_for(question), "evidence", column='report')
+    for evidence in paginate(evidence_rows, "evidence", EVIDENCE_PAGE_SIZE).itertuples():
+        common_name = common_pdf_names[evidence.row]
+        st.markdown(f"**{common_name}**")
+        with st.expander(f"View content from {common_name}", expanded=True):
+            st.markdown(evidence.evidence)
+
+# Function to show one page of a table; only the rows on that page are sent to the browser
+def paginate(df, key, page_size=TABLE_PAGE_SIZE):
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page = 1
+    if page_count > 1:
+        # The page count is part of the key, so a filter that shrinks the table starts again at page 1
+        page = st.number_input(f"Page (1-{page_count})", min_value=1, max_value=page_count, value=1, step=1,
+                               key=f"{key}_page_{page_count}")
+    start = (page - 1) * page_size
+    st.caption(f"Showing {min(start + 1, len(df))}-{min(start + page_size, len(df))} of {len(df)}")
+    return df.iloc[start:start + page_size]
+
+# Function to filter a table by report name with a search box
+def filter_by_report(df, key, column='PDF Name'):
+    query = st.text_input("Filter reports by name", key=f"{key}_filter")
+    if query:
+        df = df[df[column].str.contains(query, case=False, regex=False)]
+    return df
+
+# Function to render the risk distribution view
+def render_risk_distribution(detailed_results, total_risks, file_names, risk_stats=None):
+    st.markdown("### Overall Risk Distribution (Heatmap)")
+    risk_levels = ['Low Risk', 'Medium Risk', 'High Risk', 'No Risk Detected']
+    colors = ['#E0F7FA', '#81D4FA', '#0288D1', '#01579B']
+
+    heatmap_fig = px.imshow([[total_risks['Low'], total_risks['Medium'], total_risks['High'], total_risks['No Risk Detected']]],
+                            labels=dict(x="Risk Level", y="Reports"),
+                            x=risk_levels,
+                            color_continuous_scale=colors,
+                            title="Overall Risk Distribution Heatmap")
+    st.plotly_chart(heatmap_fig)
+
+    st.markdown("### Risk Distribution Data Summary")
+    risk_df = pd.DataFrame(detailed_results)
+    selected_levels = st.multiselect("Risk levels", list(total_risks), default=list(total_risks), key="risk_table_levels")
+    risk_df = filter_by_report(risk_df[risk_df['Risk Level'].isin(selected_levels)], "risk_table")
+    visible = paginate(risk_df, "risk_table")
+    st.table(visible)
+
+    # Additional visualization: Compliance vs. Risk correlation (density)
+    st.markdown("### Risk Density Map")
+
+    density_data = {
+        'Risk Level': ['Low', 'Medium', 'High', 'No Risk Detected'],
+        'Count': [total_risks['Low'], total_risks['Medium'], total_risks['High'], total_risks['No Risk Detected']]
+    }
+
+    density_df = pd.DataFrame(density_data)
+
+    # Density plot
+    density_fig = px.density_heatmap(density_df, x='Risk Level', y='Count',
+                                    title='Risk Distribution Density Map', nbinsx=10, nbinsy=10)
+    st.plotly_chart(density_fig)
+
+    # Page-level risk keyword density for the reports on the current table page (not available for precomputed results)
+    st.markdown("### Risk Keyword Hits by Page")
+    page_density_df = risk_density_by_page([risk_stats[i] for i in visible.index] if risk_stats else [],
+                                           [file_names[i] for i in visible.index])
+    if page_density_df.empty:
+        st.info("No risk keywords found in the reports shown above.")
+    else:
+        page_density_fig = px.density_heatmap(page_density_df, x='Page', y='PDF Name', z='Hits', histfunc='sum',
+                                              facet_col='Tier', title='Risk Keyword Hits per Page')
+        st.plotly_chart(page_density_fig)
+
+# Function to render the compliance check view
+def render_compliance_check(detailed_results, total_risks):
+    st.markdown("### Compliance Check Results (Yes/No)")
+
+    # If any risk is detected (Low, Medium, High), mark as 'Yes' for compliance issues; the totals are already aggregated
+    compliance_data = {
+        'Category': ['Yes', 'No'],
+        'Count': [
+            total_risks['Low'] + total_risks['Medium'] + total_risks['High'],  # Yes: Risk detected
+            total_risks['No Risk Detected']                                    # No: No risk detected
+        ]
+    }
+
+    compliance_df = pd.DataFrame(compliance_data)
+
+    # Create a Donut Chart for compliance (Yes/No)
+    donut_fig = px.pie(compliance_df, values='Count', names='Category', hole=0.4,
+                    title='Compliance (Yes/No) Donut Chart',
+                    color_discrete_map={'Yes': '#4CAF50', 'No': '#F44336'})
+    st.plotly_chart(donut_fig)
+
+    # Show compliance data summary as a table
+    st.markdown("### Compliance Data Summary (Yes/No)")
+    risk_df = pd.DataFrame(detailed_results)
+    compliance_detailed_df = pd.DataFrame({
+        'PDF Name': risk_df['PDF Name'],
+        'Compliance Issue': risk_df['Risk Level'].isin(['Low', 'Medium', 'High']).map({True: 'Yes', False: 'No'})
+    })
+    compliance_detailed_df = filter_by_report(compliance_detailed_df, "compliance_table")
+    st.table(paginate(compliance_detailed_df, "compliance_table"))
+
+# Function to render the question-based analysis view
+def render_question_analysis(analysis_results, file_names, questions):
+    st.markdown("### Select a Question to Visualize the Response Across PDFs")
+    selected_question = st.selectbox("Select a question:", questions)
+
+    if selected_question:
+        st.markdown(f"#### Showing Results for: {selected_question}")
+        generate_plotly_bar_chart_for_question(selected_question, analysis_results, file_names)
+        display_relevant_content_for_question(selected_question, analysis_results, file_names)
+
+# Function to render the results; only the selected view (and its figures) is built on each rerun
+def render_results(detailed_results, total_risks, analysis_results, file_names, questions, risk_stats=None):
+    view = st.radio("View", RESULT_VIEWS, horizontal=True, key="results_view", label_visibility="collapsed")
+
+    if view == "Risk Distribution":
+        render_risk_distribution(detailed_results, total_risks, file_names, risk_stats)
+    elif view == "Compliance Check":
+        render_compliance_check(detailed_results, total_risks)
+    else:
+        render_question_analysis(analysis_results, file_names, questions)
+
+# Main Streamlit app
+# configure_page is False when the page is hosted inside the multipage app (app.py), which sets the config once
+def main(configure_page=True):
+    if configure_page:
+        st.set_page_config(page_title="Cybersecurity Audit Analyzer", page_icon="🔍", layout="wide")
+    session = start_session_trace()
+
+    st.markdown("""
+    <style>
+    .title-clean {
+        font-family: 'Helvetica Neue', sans-serif;
+        font-size: 32px;
+        color: #214cce;
+        font-weight: bold;
+        text-align: center;
+    }
+    .subtitle-clean {
+        font-family: 'Arial', sans-serif;
+        font-size: 20px;
+        color: #000000;
+        font-weight: bold;
+        text-align: center;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    st.markdown('<h2 class="title-clean">CYBERSECURITY MULTIPLE AUDIT REPORT ANALYZER</h2>', unsafe_allow_html=True)
+    st.markdown('<h5 class="subtitle-clean">Upload your reports to analyze key cybersecurity compliance questions and risk levels.</h5>', unsafe_allow_html=True)
+    
+
+    with st.sidebar:
+        st.markdown("<h2 style='color: #214cce;'> 🛡️ Audit Report Tools</h2>", unsafe_allow_html=True)
+        uploaded_files = st.file_uploader("📄 Upload Cybersecurity Audit Reports (PDF)", type=["pdf"], accept_multiple_files=True)
+        st.markdown("### Enter Custom Questions:")
+        user_question = st.text_input("Type your question here")
+        classify_sentiment = st.checkbox("Classify report sentiment (local model)", value=False)
+        st.markdown("### Or Load Precomputed Results:")
+        results_file = st.file_uploader("📊 Results from batch_analyze.py (JSONL, CSV or Parquet)", type=["jsonl", "json", "csv", "parquet"])
+    sidebar_img = sidebar_image()
+    if sidebar_img is not None:
+        st.sidebar.image(sidebar_img, use_column_width=True)
+
+
+    if results_file is not None:
+        # Results computed offline by the batch CLI: render them without re-analyzing anything
+        detailed_results, total_risks, analysis_results, file_names, questions = rows_to_analysis(read_results(results_file))
+        st.success(f"Loaded precomputed results for {len(file_names)} reports.")
+        render_results(detailed_results, total_risks, analysis_results, file_names, questions)
+
+    elif uploaded_files:
+        st.success("Files uploaded successfully!")
+        file_names = [file.name for file in uploaded_files]
+
+        questions_to_analyze = KEY_DECISION_QUESTIONS.copy()
+        if user_question:
+            questions_to_analyze.append(user_question)
+
+        # Per-report results live in the session, so adding or removing a report only processes the change
+        if 'report_analysis' not in st.session_state:
+            st.session_state.report_analysis = {}
+        if 'upload_digests' not in st.session_state:
+            st.session_state.upload_digests = {}
+        try:
+            outputs = analyze_uploads(session, uploaded_files, questions_to_analyze, sentiment=classify_sentiment)
+        except DocumentError as e:
+            st.error(f"{e} Remove the report to analyze the rest.")
+        else:
+            if outputs is not None:
+                detailed_results, total_risks, analysis_results, risk_stats = outputs
+                render_results(detailed_results, total_risks, analysis_results, file_names, questions_to_analyze, risk_stats)
+
+    else:
+        # Nobody waits for an analysis of reports that were all removed
+        job_runner.release(session, 'report_analysis')
+
+    render_debug_panel()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import threading
+import functools
+import contextlib
+from collections import deque, defaultdict
+
+# Counters kept for every span and aggregated per stage
+SPAN_COUNTERS = ('prompt_tokens', 'completion_tokens', 'retries', 'coalesced', 'cache_hits', 'cache_misses', 'errors')
+MAX_SPANS = int(os.environ.get("CYBERINSIGHTS_TRACE_SPANS", 5000))
+
+# Write Prometheus text-format metrics here after each instrumented call (e.g. for a textfile collector)
+METRICS_FILE = os.environ.get("CYBERINSIGHTS_METRICS_FILE")
+
+
+class Tracer:
+    """Lightweight, process-wide recorder of timed stages.
+
+    Each ``span`` records wall time plus token usage, retries, cache hits and
+    errors attributed to it while it is the active span on its thread. Worker
+    threads can ``activate`` a parent span so their calls count towards it.
+    Recent spans are kept for the JSON trace; per-stage totals are kept for
+    the Prometheus export.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        self.totals = defaultdict(lambda: dict.fromkeys(('calls', 'seconds') + SPAN_COUNTERS, 0))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    # Function to tag spans started on this thread with a session id
+    def set_session(self, session_id):
+        self._local.session = session_id
+
+    # Function to return the innermost active span on this thread, if any
+    def current_span(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def activate(self, span):
+        """Make an existing span current on this thread (used by worker threads)."""
+        if span is None:
+            yield None
+            return
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+
+    @contextlib.contextmanager
+    def span(self, stage, **attributes):
+        """Time a block of work as one span of ``stage``."""
+        parent = self.current_span()
+        span = dict.fromkeys(SPAN_COUNTERS, 0)
+        span.update(
+            stage=stage,
+            session=getattr(self._local, 'session', None) or (parent or {}).get('session'),
+            start=time.time(),
+            duration_s=None,
+            **attributes
+        )
+        stack = self._stack()
+        stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except Exception:
+            span['errors'] += 1
+            raise
+        finally:
+            stack.pop()
+            span['duration_s'] = time.perf_counter() - started
+            with self._lock:
+                self.spans.append(span)
+                totals = self.totals[stage]
+                totals['calls'] += 1
+                totals['seconds'] += span['duration_s']
+                for counter in SPAN_COUNTERS:
+                    totals[counter] += span[counter]
+            if METRICS_FILE:
+                self.write_prometheus(METRICS_FILE)
+
+    # Function to add to a counter of the active span (no-op outside any span)
+    def add(self, counter, amount=1):
+        span = self.current_span()
+        if span is not None:
+            with self._lock:
+                span[counter] += amount
+
+    # Function to record the token usage reported in an OpenAI response
+    def record_usage(self, response):
+        usage = response.get('usage') if hasattr(response, 'get') else None
+        if usage:
+            self.add('prompt_tokens', usage.get('prompt_tokens', 0))
+            self.add('completion_tokens', usage.get('completion_tokens', 0))
+
+    # Function to record a cache lookup result
+    def record_cache(self, hit):
+        self.add('cache_hits' if hit else 'cache_misses')
+
+    # Function to summarize recorded spans per stage, optionally for one session only
+    def summary(self, session=None):
+        if session is None:
+            with self._lock:
+                return {stage: dict(totals) for stage, totals in self.totals.items()}
+        result = defaultdict(lambda: dict.fromkeys(('calls', 'seconds') + SPAN_COUNTERS, 0))
+        with self._lock:
+            spans = [span for span in self.spans if span['session'] == session]
+        for span in spans:
+            totals = result[span['stage']]
+            totals['calls'] += 1
+            totals['seconds'] += span['duration_s']
+            for counter in SPAN_COUNTERS:
+                totals[counter] += span[counter]
+        return dict(result)
+
+    # Function to export the recent spans as a JSON trace
+    def to_json(self, session=None):
+        with self._lock:
+            spans = [dict(span) for span in self.spans if session is None or span['session'] == session]
+        return json.dumps({'spans': spans, 'totals': self.summary(session)}, indent=2, default=str)
+
+    # Function to export per-stage totals in Prometheus text exposition format
+    def to_prometheus(self):
+        metrics = [('calls', 'cyberinsights_stage_calls_total', 'Number of times each stage ran'),
+                   ('seconds', 'cyberinsights_stage_seconds_total', 'Wall time spent in each stage')]
+        metrics += [(counter, f'cyberinsights_stage_{counter}_total', f'{counter.replace("_", " ").capitalize()} recorded per stage')
+                    for counter in SPAN_COUNTERS]
+        totals = self.summary()
+        lines = []
+        for key, name, help_text in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage in sorted(totals):
+                lines.append(f'{name}{{stage="{stage}"}} {totals[stage][key]}')
+        return "\n".join(lines) + "\n"
+
+    # Function to write the Prometheus export atomically to a file
+    def write_prometheus(self, path):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            handle.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+
+# Process-wide tracer shared by every module and session
+tracer = Tracer()
+
+
+# Decorator to record every call of a function as a span of the given stage
+def instrument(stage):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Decorator for generator functions: the span stays open until the generator is exhausted
+def instrument_stream(stage):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(stage):
+                yield from fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+import pandas as pd
+import streamlit as st
+from job_runner import JOB_POLL_SECONDS, QUEUED
+
+# Per-report progress is listed for jobs covering at least this many reports
+REPORT_PROGRESS_MIN_REPORTS = 2
+
+
+# Function to show a background job's progress. The fragment refreshes on its own, so the rest of the
+# page stays usable, and reruns the whole page once the job has finished so its result is picked up.
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_progress(job):
+    if job.finished is not None:
+        st.rerun()
+    if job.status == QUEUED:
+        st.progress(0.0, text=f"⏳ {job.label}: waiting for a worker...")
+        return
+    st.progress(job.fraction(), text=f"⏳ {job.label}: {job.done}/{job.total} steps" + (f" ({job.message})" if job.message else ""))
+    reports = job.report_progress()
+    if len(reports) >= REPORT_PROGRESS_MIN_REPORTS:
+        with st.expander("Progress per report", expanded=False):
+            df = pd.DataFrame([(report, done, total) for report, (done, total) in reports.items()],
+                              columns=['Report', 'Done', 'Steps'])
+            st.dataframe(df, hide_index=True, use_container_width=True)
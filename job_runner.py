@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import tracer
+
+# Background workers shared by every session; jobs mostly wait on the API or on torch, so threads are enough
+DEFAULT_JOB_WORKERS = int(os.environ.get("CYBERINSIGHTS_JOB_WORKERS", 4))
+# Finished jobs are dropped from the registry this many seconds after they finish
+JOB_TTL = float(os.environ.get("CYBERINSIGHTS_JOB_TTL", 3600))
+# How often a page waiting on a job refreshes its progress
+JOB_POLL_SECONDS = float(os.environ.get("CYBERINSIGHTS_JOB_POLL_SECONDS", 1.0))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# Function to key a job by its kind and inputs, so identical submissions from any session share one job
+def job_key(kind, *inputs):
+    payload = json.dumps([kind, *inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _NoProgress:
+    """Progress sink used when work runs outside a background job."""
+
+    def add_steps(self, count, report=None):
+        pass
+
+    def advance(self, count=1, report=None, message=None):
+        pass
+
+
+NO_PROGRESS = _NoProgress()
+
+
+class Job:
+    """One background computation, its progress and its outcome.
+
+    Work reports progress in steps (e.g. one per extracted report or per
+    answered report × question pair), counted overall and per report. Steps
+    are added as each stage starts, so the total can grow while the job runs.
+    """
+
+    def __init__(self, job_id, kind, label=None):
+        self.job_id = job_id
+        self.kind = kind
+        self.label = label or kind
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.reports = {}  # report -> [done, total]
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.sessions = set()
+        self.future = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    # Function to register `count` more steps of work, optionally for one report
+    def add_steps(self, count, report=None):
+        with self._lock:
+            self.total += count
+            if report is not None:
+                self.reports.setdefault(report, [0, 0])[1] += count
+
+    # Function to mark `count` steps as done, optionally for one report
+    def advance(self, count=1, report=None, message=None):
+        with self._lock:
+            self.done += count
+            if report is not None:
+                self.reports.setdefault(report, [0, 0])[0] += count
+            if message:
+                self.message = message
+
+    # Function to return the share of the registered steps that are done
+    def fraction(self):
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    # Function to return a snapshot of {report: (done, total)}
+    def report_progress(self):
+        with self._lock:
+            return {report: tuple(counts) for report, counts in self.reports.items()}
+
+
+class JobRunner:
+    """Runs long analyses on a shared worker pool, outside the Streamlit script run.
+
+    Jobs are registered by input hash: a session submitting inputs that are
+    already queued, running or recently finished joins that job instead of
+    starting another, so users uploading the same reports share the work.
+    Each session also records its current job of every kind, so the next
+    rerun finds the job again and shows its progress or picks up its result.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cyberinsights-job")
+        self._jobs = {}  # job_id -> Job
+        self._sessions = {}  # session -> {kind: job_id}
+        self._lock = threading.Lock()
+
+    # Function to start (or join) the job computing fn(*args, progress=job, **kwargs) for the given inputs.
+    # A failed job is returned as it is, so its error can be shown, unless restart_failed is set.
+    def submit(self, kind, inputs, fn, *args, session=None, label=None, restart_failed=False, **kwargs):
+        job_id = job_key(kind, *inputs)
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None or (restart_failed and job.status == FAILED):
+                job = self._jobs[job_id] = Job(job_id, kind, label)
+                job.future = self._pool.submit(self._run, job, fn, args, kwargs, session)
+            if session is not None:
+                self._attach(session, job)
+        return job
+
+    # Function to return the job of a kind a session last submitted, if it is still registered
+    def session_job(self, session, kind):
+        with self._lock:
+            job_id = self._sessions.get(session, {}).get(kind)
+            return self._jobs.get(job_id)
+
+    # Function to detach a session from its job of a kind (e.g. once the result was picked up)
+    def release(self, session, kind):
+        with self._lock:
+            job_id = self._sessions.get(session, {}).pop(kind, None)
+            if job_id is not None and job_id in self._jobs:
+                self._detach(session, self._jobs[job_id])
+
+    def _attach(self, session, job):
+        kinds = self._sessions.setdefault(session, {})
+        previous = self._jobs.get(kinds.get(job.kind))
+        if previous is not None and previous is not job:
+            self._detach(session, previous)
+        kinds[job.kind] = job.job_id
+        job.sessions.add(session)
+
+    def _detach(self, session, job):
+        job.sessions.discard(session)
+        # Nobody is waiting for a job that has not started yet, so it is dropped instead of run
+        if not job.sessions and job.status == QUEUED and job.future.cancel():
+            del self._jobs[job.job_id]
+
+    def _expire(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and now - job.finished > self.ttl]:
+            del self._jobs[job_id]
+        for session in [session for session, kinds in self._sessions.items()
+                        if not any(job_id in self._jobs for job_id in kinds.values())]:
+            del self._sessions[session]
+
+    def _run(self, job, fn, args, kwargs, session):
+        job.status = RUNNING
+        # Spans recorded by the job count towards the session that started it
+        tracer.set_session(session)
+        try:
+            job.result = fn(*args, progress=job, **kwargs)
+        except Exception as error:
+            job.error = error
+            job.status = FAILED
+        else:
+            job.status = DONE
+        finally:
+            job.finished = time.time()
+
+
+# Process-wide job runner shared by every page and session
+job_runner = JobRunner()
@@ -0,0 +1,59 @@
+from bisect import bisect_right
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every occurrence of many keywords in one pass over the text.
+
+    Matching is case-insensitive and, like ``keyword in text``, works on plain
+    substrings, so overlapping and nested keywords are all reported.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword)
+
+        # Breadth-first pass to wire failure links and merge the outputs of suffix states
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    # Function to yield (start offset, keyword) for every match in the text
+    def find_all(self, text):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, ch in enumerate(text.lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword in output[state]:
+                yield position - len(keyword) + 1, keyword
+
+
+# Function to map a character offset to a 1-based page number using the page start offsets
+def page_for_offset(offset, page_offsets):
+    if not page_offsets:
+        return 1
+    return max(1, bisect_right(page_offsets, offset))
@@ -0,0 +1,99 @@
+import os
+import json
+import contextlib
+import hashlib
+import sqlite3
+import threading
+import time
+from document_store import DEFAULT_CACHE_DIR
+
+# Default lifetime and size budget for cached LLM answers
+DEFAULT_TTL_SECONDS = float(os.environ.get("CYBERINSIGHTS_LLM_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_BYTES = int(os.environ.get("CYBERINSIGHTS_LLM_CACHE_BYTES", 64 * 1024 * 1024))
+
+
+# Function to build the cache key for one answer about one document
+def make_cache_key(doc_id, question, model, prompt_template, context_strategy=""):
+    payload = json.dumps([doc_id, question, model, prompt_template, context_strategy], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed cache of LLM completions keyed by document hash, question, model and prompt template.
+
+    Entries older than ``ttl`` seconds are treated as misses and purged; once the
+    stored answers exceed ``max_bytes`` the least recently used ones are evicted.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "llm_responses.sqlite3")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # Function to return a cached answer, or None if it is missing or expired
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl and now - created > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    # Function to store an answer and enforce the TTL and size budget
+    def put(self, key, value):
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode('utf-8')), now, now),
+            )
+            self._evict(conn, now)
+        return value
+
+    # Function to purge expired entries, then least recently used ones until under max_bytes
+    def _evict(self, conn, now):
+        if self.ttl:
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import tracer
+
+# Point every call at another OpenAI-compatible backend (e.g. benchmarks/mock_llm_server.py) with OPENAI_API_BASE
+DEFAULT_API_BASE = os.environ.get("OPENAI_API_BASE")
+
+# Keep-alive connections kept per host; should be at least the number of concurrent calls
+DEFAULT_POOL_SIZE = int(os.environ.get("CYBERINSIGHTS_LLM_POOL_SIZE", 16))
+DEFAULT_TIMEOUT = float(os.environ.get("CYBERINSIGHTS_LLM_TIMEOUT", 60))
+DEFAULT_MAX_RETRIES = int(os.environ.get("CYBERINSIGHTS_LLM_MAX_RETRIES", 5))
+
+# Per-model request timeouts in seconds; other models use DEFAULT_TIMEOUT
+MODEL_TIMEOUTS = {
+    'gpt-3.5-turbo': 30,
+    'gpt-4': 120,
+}
+
+# Errors worth retrying with backoff; anything else is surfaced to the caller straight away
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.ServiceUnavailableError,
+)
+
+
+# Function to build a requests session that keeps connections to the API alive between calls and threads
+def make_session(pool_size=DEFAULT_POOL_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Function to key a request so identical concurrent calls can share one response
+def request_key(request):
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class _InFlight:
+    """One running request and everything it has produced so far, shared by every caller that asked for it."""
+
+    def __init__(self):
+        self.response = None
+        self.chunks = []
+        self.error = None
+        self.done = False
+        self.condition = threading.Condition()
+
+    def finish(self, response=None, error=None):
+        with self.condition:
+            self.response = response
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            while not self.done:
+                self.condition.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class LLMClient:
+    """Shared chat completion client used by every OpenAI call site.
+
+    All calls go through one pooled keep-alive HTTP session, get a per-model
+    timeout and are retried with exponential backoff and jitter on rate-limit
+    and transient errors. Identical requests that are in flight at the same
+    time are coalesced: the later callers wait for, and share, the first
+    caller's response (or stream).
+    """
+
+    def __init__(self, api_base=DEFAULT_API_BASE, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=1.0, max_delay=30.0, timeouts=None):
+        self.api_base = api_base
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeouts = dict(MODEL_TIMEOUTS, **(timeouts or {}))
+        self.session = make_session(pool_size)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # openai<1 sends every request through this session instead of one new session per thread
+        openai.requestssession = self.session
+
+    # Function to switch the backend (e.g. to a local OpenAI-compatible stub) for every later call
+    def configure_backend(self, api_base=None, api_key=None):
+        self.api_base = api_base
+        if api_key is not None:
+            openai.api_key = api_key
+
+    # Function to return the request timeout for a model
+    def timeout_for(self, model):
+        return self.timeouts.get(model, DEFAULT_TIMEOUT)
+
+    # Function to call the API once per attempt, retrying transient failures with backoff
+    def _call(self, request, timeout=None, max_retries=None, rate_limiter=None):
+        max_retries = self.max_retries if max_retries is None else max_retries
+        kwargs = dict(request, request_timeout=timeout or self.timeout_for(request.get('model')))
+        if self.api_base:
+            kwargs['api_base'] = self.api_base
+        attempt = 0
+        while True:
+            if rate_limiter:
+                rate_limiter.acquire()
+            try:
+                return openai.ChatCompletion.create(**kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt >= max_retries:
+                    raise
+                tracer.add('retries')
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+
+    # Function to join an identical in-flight request, or register this one as the leader
+    def _join(self, key):
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                return in_flight, False
+            in_flight = self._in_flight[key] = _InFlight()
+            return in_flight, True
+
+    def _leave(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    # Function to run a (non-streaming) chat completion, sharing the response with identical concurrent calls
+    def create(self, request, timeout=None, max_retries=None, rate_limiter=None):
+        key = request_key(request)
+        in_flight, leader = self._join(key)
+        if not leader:
+            tracer.add('coalesced')
+            return in_flight.wait()
+        try:
+            response = self._call(request, timeout, max_retries, rate_limiter)
+        except Exception as error:
+            in_flight.finish(error=error)
+            raise
+        else:
+            in_flight.finish(response=response)
+            tracer.record_usage(response)
+            return response
+        finally:
+            self._leave(key)
+
+    # Function to stream a chat completion's chunks; identical concurrent streams read from one upstream response
+    def stream(self, request, timeout=None, max_retries=None):
+        request = dict(request, stream=True)
+        key = request_key(request)
+        in_flight, leader = self._join(key)
+        if leader:
+            # The upstream stream is read on its own thread, so it completes for every follower
+            # even if the caller that started it stops reading early
+            parent = tracer.current_span()
+            threading.Thread(target=self._pump, args=(key, in_flight, request, timeout, max_retries, parent),
+                             daemon=True).start()
+        else:
+            tracer.add('coalesced')
+        return self._replay(in_flight)
+
+    def _pump(self, key, in_flight, request, timeout, max_retries, parent):
+        with tracer.activate(parent):
+            try:
+                for chunk in self._call(request, timeout, max_retries):
+                    with in_flight.condition:
+                        in_flight.chunks.append(chunk)
+                        in_flight.condition.notify_all()
+            except Exception as error:
+                in_flight.finish(error=error)
+            else:
+                in_flight.finish()
+            finally:
+                self._leave(key)
+
+    def _replay(self, in_flight):
+        position = 0
+        while True:
+            with in_flight.condition:
+                while position >= len(in_flight.chunks) and not in_flight.done:
+                    in_flight.condition.wait()
+                chunks = in_flight.chunks[position:]
+                done = in_flight.done
+                error = in_flight.error
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+            if done and position >= len(in_flight.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+# Process-wide client shared by every page, session and worker thread
+llm_client = LLMClient()
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import tracer
+from llm_client import llm_client, DEFAULT_MAX_RETRIES
+
+# Defaults for the concurrent completion engine; each can be overridden per executor
+DEFAULT_CONCURRENCY = int(os.environ.get("CYBERINSIGHTS_LLM_CONCURRENCY", 8))
+DEFAULT_REQUESTS_PER_MINUTE = float(os.environ.get("CYBERINSIGHTS_LLM_RPM", 500))
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces requests out to ``rate`` per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Function to block until a token is available, then consume it
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CompletionExecutor:
+    """Runs many chat completion calls on a bounded thread pool.
+
+    Calls are rate limited by a shared token bucket and sent through the
+    pooled ``llm_client`` (per-model timeout unless ``timeout`` is given,
+    retries with backoff, coalescing of identical requests). Results come
+    back in the order the requests were submitted.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 timeout=None, max_retries=DEFAULT_MAX_RETRIES, client=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.client = client or llm_client
+        self.rate_limiter = TokenBucket(requests_per_minute / 60.0) if requests_per_minute else None
+
+    # Function to run one completion request with rate limiting, timeout and retries
+    def create(self, request):
+        return self.client.create(request, timeout=self.timeout, max_retries=self.max_retries,
+                                  rate_limiter=self.rate_limiter)
+
+    # Function to run a list of completion requests concurrently, returning responses in order.
+    # on_done(index) is called (from the worker thread) as each request completes, e.g. to report progress.
+    def map(self, requests, on_done=None):
+        requests = list(requests)
+        if not requests:
+            return []
+
+        def create(index, request):
+            response = self.create(request)
+            if on_done:
+                on_done(index)
+            return response
+
+        workers = min(self.max_concurrency, len(requests))
+        if workers <= 1:
+            return [create(index, request) for index, request in enumerate(requests)]
+        # Worker threads report usage and retries to the caller's active span
+        parent = tracer.current_span()
+
+        def create_in_parent(index, request):
+            with tracer.activate(parent):
+                return create(index, request)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(create_in_parent, range(len(requests)), requests))
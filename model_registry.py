@@ -0,0 +1,62 @@
+import os
+import threading
+
+# BART checkpoint used for report summarization
+SUMMARIZATION_MODEL = 'facebook/bart-large-cnn'
+
+# Three-class (negative/neutral/positive) sequence classifier used for offline report sentiment
+SENTIMENT_MODEL = os.environ.get("CYBERINSIGHTS_SENTIMENT_MODEL", 'cardiffnlp/twitter-roberta-base-sentiment-latest')
+
+# Set CYBERINSIGHTS_QUANTIZE=1 to serve a dynamically quantized int8 copy of the model on CPU
+QUANTIZE_MODELS = os.environ.get("CYBERINSIGHTS_QUANTIZE", "0") == "1"
+
+# Models are loaded on first use and shared by every session (and page) in this server process
+_models = {}
+_lock = threading.Lock()
+
+
+# Function to return a model from the registry, loading it with the given loader on first use
+def get_model(key, loader):
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        if key not in _models:
+            _models[key] = loader()
+        return _models[key]
+
+
+# Function to load the BART tokenizer and model, optionally quantizing the linear layers to int8
+def load_summarization_model(quantize):
+    import torch
+    from transformers import BartTokenizer, BartForConditionalGeneration
+
+    tokenizer = BartTokenizer.from_pretrained(SUMMARIZATION_MODEL)
+    model = BartForConditionalGeneration.from_pretrained(SUMMARIZATION_MODEL)
+    model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+
+# Function to get the shared (tokenizer, model) pair for summarization
+def get_summarization_model(quantize=QUANTIZE_MODELS):
+    return get_model(('summarization', quantize), lambda: load_summarization_model(quantize))
+
+
+# Function to load the sentiment tokenizer and classifier, optionally quantizing the linear layers to int8
+def load_sentiment_model(quantize):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL)
+    model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+
+# Function to get the shared (tokenizer, model) pair for sentiment classification
+def get_sentiment_model(quantize=QUANTIZE_MODELS):
+    return get_model(('sentiment', quantize), lambda: load_sentiment_model(quantize))
@@ -0,0 +1,74 @@
+import os
+import hashlib
+import json
+from fpdf import FPDF
+
+# Unicode TTF font used for the exported chat history; without one, core Helvetica is used and
+# characters outside Latin-1 are replaced
+FONT_PATH = os.environ.get("CYBERINSIGHTS_PDF_FONT") or None
+PDF_FILE_NAME = "search_history.pdf"
+
+
+# Function to hash a chat history so cached PDF bytes can be checked against the current history
+def history_digest(history):
+    payload = json.dumps([[entry.get('role'), entry.get('content'), entry.get('question'), entry.get('response')]
+                          for entry in history], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Function to make text printable with the core fonts, which only cover Latin-1
+def latin1(text):
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+# Function to lay out one chat history entry
+def add_entry(pdf, entry, encode=str):
+    if 'question' in entry or 'response' in entry:
+        question = entry.get('question', 'No question provided')
+        response = entry.get('response', 'No response provided')
+        pdf.cell(200, 10, text=encode(f"Question: {question}"), new_x="LMARGIN", new_y="NEXT", align='L')
+        pdf.multi_cell(0, 10, text=encode(f"Response: {response}"))
+    elif entry.get('role') == 'user':
+        pdf.multi_cell(0, 10, text=encode(f"Question: {entry.get('content', '')}"))
+    else:
+        pdf.multi_cell(0, 10, text=encode(f"Response: {entry.get('content', '')}"))
+    # Add some space between each entry
+    pdf.ln(5)
+
+
+class ChatPdfExporter:
+    """Exports a chat history as a PDF on demand, caching the rendered bytes.
+
+    Each export lays the whole history out in a fresh ``FPDF`` document. The
+    bytes are cached under a digest of the history, so repeated downloads of
+    an unchanged chat are not laid out again.
+    """
+
+    def __init__(self, font_path=FONT_PATH):
+        self.font_path = font_path
+        self._rendered = None  # (history digest, PDF bytes)
+
+    # Function to start a new document with the title laid out, returning it with the text encoder for its font
+    def _new_document(self):
+        pdf = FPDF()
+        pdf.add_page()
+        if self.font_path:
+            pdf.add_font("DejaVu", "", self.font_path)
+            pdf.set_font("DejaVu", size=12)
+            encode = str
+        else:
+            pdf.set_font("Helvetica", size=12)
+            encode = latin1
+        pdf.cell(200, 10, text="Search History", new_x="LMARGIN", new_y="NEXT", align='C')
+        pdf.ln(10)  # Add some space after the title
+        return pdf, encode
+
+    # Function to render the history, reusing the cached bytes if it has not changed since the last export
+    def render(self, history):
+        digest = history_digest(history)
+        if self._rendered is None or self._rendered[0] != digest:
+            pdf, encode = self._new_document()
+            for entry in history:
+                add_entry(pdf, entry, encode)
+            self._rendered = (digest, bytes(pdf.output()))
+        return self._rendered[1]
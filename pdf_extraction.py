@@ -0,0 +1,310 @@
+import os
+import hashlib
+import mmap
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import accumulate
+from PyPDF2 import PdfReader
+from document_store import DocumentStore
+from text_compaction import compact_pages
+from instrumentation import instrument, tracer
+from job_runner import NO_PROGRESS
+
+# Shared on-disk cache of extracted report text, keyed by the SHA-256 of the PDF bytes
+document_store = DocumentStore()
+
+# Number of worker processes used to parse several uploaded PDFs at once
+DEFAULT_PDF_WORKERS = int(os.environ.get("CYBERINSIGHTS_PDF_WORKERS", os.cpu_count() or 1))
+# Parsing workers are spawned, not forked: forking the multi-threaded server (Streamlit, the job runner,
+# torch) can copy held locks into the child and deadlock it
+PDF_POOL_START_METHOD = "spawn"
+
+# Ingestion budgets: larger uploads are rejected before parsing (0 disables a limit)
+MAX_PDF_BYTES = int(os.environ.get("CYBERINSIGHTS_MAX_PDF_BYTES", 200 * 1024 * 1024))
+MAX_PDF_PAGES = int(os.environ.get("CYBERINSIGHTS_MAX_PDF_PAGES", 2000))
+
+# Uploads are copied to temporary files in this directory (default: the system temp dir) in chunks of this size
+SPOOL_DIR = os.environ.get("CYBERINSIGHTS_SPOOL_DIR") or None
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+# Bump whenever parsing changes its output, so documents cached by older versions are re-parsed
+EXTRACTION_VERSION = 4
+
+# Separator placed between pages in the joined text
+PAGE_SEPARATOR = "\n\n"
+
+
+class DocumentError(ValueError):
+    """Raised when an upload cannot be ingested; the message names the file and the reason."""
+
+
+class DocumentTooLargeError(DocumentError):
+    """Raised when an upload exceeds the configured byte or page budget."""
+
+
+class DocumentParseError(DocumentError):
+    """Raised when an upload is not a readable PDF (corrupt, truncated, encrypted or empty)."""
+
+
+# Function to read the raw bytes of an uploaded file (Streamlit UploadedFile, file object or path)
+def read_file_bytes(file):
+    if isinstance(file, bytes):
+        return file
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            return handle.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    position = file.tell()
+    file.seek(0)
+    data = file.read()
+    file.seek(position)
+    return data
+
+
+# Function to stream the bytes of an upload in fixed-size chunks without copying the whole file
+def iter_file_chunks(file, chunk_size=SPOOL_CHUNK_BYTES):
+    if isinstance(file, bytes):
+        view = memoryview(file)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+        return
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            yield from iter(lambda: handle.read(chunk_size), b"")
+        return
+    position = file.tell()
+    file.seek(0)
+    try:
+        yield from iter(lambda: file.read(chunk_size), b"")
+    finally:
+        file.seek(position)
+
+
+# Function to describe an upload in error messages
+def display_name(file):
+    return file if isinstance(file, str) else getattr(file, "name", None) or "upload"
+
+
+# Function to reject uploads over the byte budget
+def check_byte_budget(file, byte_size, max_bytes=None):
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
+    if max_bytes and byte_size > max_bytes:
+        raise DocumentTooLargeError(
+            f"{display_name(file)} is {byte_size / 1024 ** 2:.1f} MB; the limit is {max_bytes / 1024 ** 2:.0f} MB "
+            f"(CYBERINSIGHTS_MAX_PDF_BYTES)."
+        )
+
+
+# Function to hash an upload chunk by chunk, enforcing the byte budget, and return (doc_id, byte_size)
+def file_digest(file, max_bytes=None):
+    digest = hashlib.sha256()
+    byte_size = 0
+    for chunk in iter_file_chunks(file):
+        digest.update(chunk)
+        byte_size += len(chunk)
+        check_byte_budget(file, byte_size, max_bytes)
+    return digest.hexdigest(), byte_size
+
+
+# Function to copy an upload to a temporary file chunk by chunk (paths on disk are used as they are)
+def spool_to_disk(file):
+    if isinstance(file, str):
+        return file, False
+    with tempfile.NamedTemporaryFile(prefix="cyberinsights-", suffix=".pdf", dir=SPOOL_DIR, delete=False) as handle:
+        for chunk in iter_file_chunks(file):
+            handle.write(chunk)
+    return handle.name, True
+
+
+# Function to compute the content hash used as the document key
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Function to compute the content hash of already extracted text
+def hash_text(text):
+    return hash_bytes(text.encode('utf-8'))
+
+
+# Function to extract the text of every page, treating pages without a text layer as empty. Compaction needs
+# all pages at once to find repeated headers and footers, so MAX_PDF_PAGES is what bounds memory here.
+def iter_page_texts(reader):
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+# Function to pass pages through while recording their lengths, so the raw size is known without keeping them
+def measure_pages(pages, sizes):
+    for page in pages:
+        sizes.append(len(page))
+        yield page
+
+
+# Function to extract compacted text, per-page start offsets and metadata from an open reader
+def parse_pdf_reader(reader, byte_size, max_pages=None, name="upload"):
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    page_count = len(reader.pages)
+    if max_pages and page_count > max_pages:
+        raise DocumentTooLargeError(
+            f"{name} has {page_count} pages; the limit is {max_pages} (CYBERINSIGHTS_MAX_PDF_PAGES)."
+        )
+    raw_sizes = []
+    # Strip headers, footers and repeated boilerplate once here, so every prompt built from the text is denser.
+    # Pages are split into lines as they are extracted, so the raw page strings are not all kept alongside them.
+    pages = compact_pages(measure_pages(iter_page_texts(reader), raw_sizes))
+    # Join once instead of growing a string page by page, which is quadratic on long reports
+    text = PAGE_SEPARATOR.join(pages)
+    page_offsets = list(accumulate([0] + [len(page) + len(PAGE_SEPARATOR) for page in pages[:-1]])) if pages else []
+
+    info = reader.metadata or {}
+    metadata = {
+        'page_count': len(page_offsets),
+        'byte_size': byte_size,
+        'raw_chars': sum(raw_sizes),
+        'extraction_version': EXTRACTION_VERSION,
+        'pdf_info': {str(key): str(value) for key, value in info.items()},
+    }
+    return text, page_offsets, metadata
+
+
+# Function to parse a PDF on disk through a read-only memory map, so the file is paged in by the OS
+# rather than copied into the process
+def parse_pdf_file(path, name=None):
+    name = name or os.path.basename(path)
+    with open(path, "rb") as handle:
+        byte_size = os.fstat(handle.fileno()).st_size
+        if not byte_size:
+            raise DocumentParseError(f"{name} is empty.")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                return parse_pdf_reader(PdfReader(mapped), byte_size, name=name)
+            except DocumentError:
+                raise
+            except Exception as error:
+                # PyPDF2 raises many exception types for damaged files; callers only need to know this one is unreadable
+                raise DocumentParseError(f"{name} could not be read as a PDF ({type(error).__name__}: {error}).") from error
+
+
+# Function to parse an upload via a spooled temporary file
+def parse_upload(file):
+    path, temporary = spool_to_disk(file)
+    try:
+        return parse_pdf_file(path, display_name(file))
+    finally:
+        if temporary:
+            os.remove(path)
+
+
+_pdf_pool = None  # (max_workers, ProcessPoolExecutor)
+_pdf_pool_lock = threading.Lock()
+
+
+# Function to return the process pool shared by every load, created on first use. Spawned workers are slow
+# to start, so they are kept for the life of the process; asking for another size replaces the pool.
+def get_pdf_pool(max_workers):
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None or _pdf_pool[0] != max_workers:
+            if _pdf_pool is not None:
+                _pdf_pool[1].shutdown(wait=False)
+            context = multiprocessing.get_context(PDF_POOL_START_METHOD)
+            _pdf_pool = (max_workers, ProcessPoolExecutor(max_workers=max_workers, mp_context=context))
+        return _pdf_pool[1]
+
+
+# Function to drop a pool whose worker died, so the next load starts a fresh one
+def discard_pdf_pool(pool):
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None and _pdf_pool[1] is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False)
+
+
+# Function to look up a parsed document, ignoring entries written by an older extraction version
+def get_cached_document(store, doc_id):
+    record = store.get(doc_id)
+    if record is not None and record['metadata'].get('extraction_version') != EXTRACTION_VERSION:
+        return None
+    return record
+
+
+# Function to load a document from the store, parsing it only on a cache miss
+@instrument("extract_text_from_pdf")
+def load_document(file, store=None):
+    store = store or document_store
+    doc_id, _ = file_digest(file)
+
+    record = get_cached_document(store, doc_id)
+    tracer.record_cache(record is not None)
+    if record is None:
+        text, page_offsets, metadata = parse_upload(file)
+        metadata['file_name'] = getattr(file, "name", None)
+        record = store.put(doc_id, text, page_offsets, metadata)
+    return record
+
+
+
+# Function to load many documents, parsing cache misses in parallel on a process pool.
+# `progress` (e.g. a background Job) gets one step per report, done once the report is cached or parsed.
+@instrument("extract_texts_from_pdfs")
+def load_documents(files, max_workers=None, store=None, progress=NO_PROGRESS):
+    store = store or document_store
+    max_workers = max_workers or DEFAULT_PDF_WORKERS
+    for file in files:
+        progress.add_steps(1, report=display_name(file))
+    doc_ids = [file_digest(file)[0] for file in files]
+
+    records = {}
+    to_parse = {}
+    for file, doc_id in zip(files, doc_ids):
+        if doc_id in records or doc_id in to_parse:
+            continue
+        record = get_cached_document(store, doc_id)
+        tracer.record_cache(record is not None)
+        if record is None:
+            to_parse[doc_id] = file
+        else:
+            records[doc_id] = record
+    # Uploads served from the cache are done straight away; the others once their document is parsed
+    uploads = {}
+    for file, doc_id in zip(files, doc_ids):
+        if doc_id in to_parse:
+            uploads.setdefault(doc_id, []).append(display_name(file))
+        else:
+            progress.advance(1, report=display_name(file))
+
+    if to_parse:
+        pending = list(to_parse.items())
+        workers = min(max_workers, len(pending))
+        if workers > 1:
+            # Workers get file paths, not bytes: uploads are spooled to disk and each worker maps its own file
+            spooled = [spool_to_disk(file) for _, file in pending]
+            pool = get_pdf_pool(max_workers)
+            try:
+                parsed = pool.map(parse_pdf_file, [path for path, _ in spooled], [display_name(file) for _, file in pending])
+                store_parsed(store, pending, parsed, records, uploads, progress)
+            except BrokenProcessPool:
+                discard_pdf_pool(pool)
+                raise
+            finally:
+                for path, temporary in spooled:
+                    if temporary:
+                        os.remove(path)
+        else:
+            store_parsed(store, pending, (parse_upload(file) for _, file in pending), records, uploads, progress)
+
+    return [records[doc_id] for doc_id in doc_ids]
+
+
+# Function to store parsed documents as they arrive, advancing progress for every upload of each one
+def store_parsed(store, pending, parsed, records, uploads, progress):
+    for (doc_id, file), (text, page_offsets, metadata) in zip(pending, parsed):
+        metadata['file_name'] = getattr(file, "name", None)
+        records[doc_id] = store.put(doc_id, text, page_offsets, metadata)
+        for name in uploads[doc_id]:
+            progress.advance(1, report=name, message=f"Extracted {name}")
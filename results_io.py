@@ -0,0 +1,86 @@
+import os
+import json
+import pandas as pd
+from results_matrix import ResultsMatrix
+
+# Columns of a flat (report, question) results file
+RESULT_COLUMNS = ['report', 'doc_id', 'risk_level', 'high_hits', 'medium_hits', 'low_hits', 'question', 'verdict', 'evidence']
+RESULT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+# Function to flatten a ResultsMatrix into one row per (report, question)
+def analysis_to_rows(results, detailed_results, doc_ids):
+    risk_by_report = {res['PDF Name']: res for res in detailed_results}
+    long = results.to_long()
+    long['doc_id'] = long['row'].map(dict(enumerate(doc_ids)))
+    for column, key in (('risk_level', 'Risk Level'), ('high_hits', 'High Hits'),
+                        ('medium_hits', 'Medium Hits'), ('low_hits', 'Low Hits')):
+        long[column] = long['report'].map({report: risk.get(key) for report, risk in risk_by_report.items()})
+    return long[RESULT_COLUMNS].to_dict('records')
+
+
+# Function to rebuild the structures the Streamlit tabs render from flat result rows
+def rows_to_analysis(rows):
+    df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    file_names = list(pd.unique(df['report']))
+    questions = list(pd.unique(df['question']))
+    row_of_report = {report: row for row, report in enumerate(file_names)}
+    results = ResultsMatrix.from_answers(file_names, questions, zip(
+        df['report'].map(row_of_report), df['question'], df['verdict'], df['evidence'].fillna("")
+    ))
+
+    reports = df.drop_duplicates('report').set_index('report')
+    detailed_results = []
+    total_risks = {'Low': 0, 'Medium': 0, 'High': 0, 'No Risk Detected': 0}
+    for report in file_names:
+        row = reports.loc[report]
+        risk_level = row['risk_level'] or 'No Risk Detected'
+        detailed_results.append({
+            'PDF Name': report,
+            'Risk Detected': 'Yes' if risk_level in ['Low', 'Medium', 'High'] else 'No',
+            'Risk Level': risk_level,
+            'High Hits': row['high_hits'],
+            'Medium Hits': row['medium_hits'],
+            'Low Hits': row['low_hits']
+        })
+        total_risks[risk_level] += 1
+    return detailed_results, total_risks, results, file_names, questions
+
+
+# Function to pick the file format from an explicit choice or the file extension
+def detect_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(getattr(path, 'name', path))[1].lstrip('.').lower()
+    if fmt == 'json':
+        fmt = 'jsonl'
+    if fmt not in RESULT_FORMATS:
+        raise ValueError(f"Unsupported results format '{fmt}'; expected one of {', '.join(RESULT_FORMATS)}")
+    return fmt
+
+
+# Function to write result rows as JSON Lines, CSV or Parquet (Parquet needs pyarrow or fastparquet)
+def write_results(rows, path, fmt=None):
+    fmt = detect_format(path, fmt)
+    if fmt == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as handle:
+            for row in rows:
+                handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return
+    df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+
+
+# Function to read result rows from a path or an uploaded file
+def read_results(file, fmt=None):
+    fmt = detect_format(file, fmt)
+    if fmt == 'jsonl':
+        if isinstance(file, str):
+            with open(file, encoding='utf-8') as handle:
+                lines = handle.read().splitlines()
+        else:
+            lines = file.read().decode('utf-8').splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+    df = pd.read_csv(file, keep_default_na=False) if fmt == 'csv' else pd.read_parquet(file)
+    return df.to_dict('records')
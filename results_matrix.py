@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+EVIDENCE_COLUMNS = ['report', 'evidence']
+
+
+class ResultsMatrix:
+    """Report × question analysis results stored column-wise.
+
+    ``verdicts`` is a boolean DataFrame with one row per report (in upload
+    order) and one column per question; True means the answer was 'yes'.
+    ``evidence`` holds the supporting text of every 'yes' answer, indexed by
+    (row, question), with the report name in a column. Reports are addressed
+    by row position so two uploads with the same file name stay distinct.
+    """
+
+    def __init__(self, reports, questions, verdicts=None, evidence=None):
+        self.reports = list(reports)
+        self.questions = list(dict.fromkeys(questions))
+        if verdicts is None:
+            verdicts = pd.DataFrame(np.zeros((len(self.reports), len(self.questions)), dtype=bool), columns=self.questions)
+        if evidence is None:
+            evidence = pd.DataFrame(columns=EVIDENCE_COLUMNS,
+                                    index=pd.MultiIndex.from_tuples([], names=['row', 'question']))
+        self.verdicts = verdicts
+        self.evidence = evidence
+
+    # Function to build the matrix from (row, question, verdict, evidence) answers
+    @classmethod
+    def from_answers(cls, reports, questions, answers):
+        results = cls(reports, questions)
+        question_index = {question: i for i, question in enumerate(results.questions)}
+        values = results.verdicts.to_numpy(copy=True)
+        evidence_rows = []
+        for row, question, verdict, evidence in answers:
+            if verdict == 'yes':
+                values[row, question_index[question]] = True
+                evidence_rows.append((row, question, results.reports[row], evidence or 'yes'))
+        results.verdicts = pd.DataFrame(values, columns=results.questions)
+        if evidence_rows:
+            results.evidence = (pd.DataFrame(evidence_rows, columns=['row', 'question'] + EVIDENCE_COLUMNS)
+                                .set_index(['row', 'question']).sort_index())
+        return results
+
+    # Function to return the yes/no column of one question, one boolean per report
+    def answers_for(self, question):
+        return self.verdicts[question]
+
+    # Function to return the evidence rows (row, report, evidence) of one question, in report order
+    def evidence_for(self, question):
+        matches = self.evidence[self.evidence.index.get_level_values('question') == question]
+        if matches.empty:
+            # A question answered 'no' for every report has no evidence rows
+            return pd.DataFrame(columns=['row'] + EVIDENCE_COLUMNS)
+        return matches.reset_index().drop(columns='question')
+
+    # Function to flatten the matrix into one row per (report, question) with verdict and evidence columns
+    def to_long(self):
+        verdicts = self.verdicts.copy()
+        verdicts.index.name = 'row'
+        long = verdicts.melt(ignore_index=False, var_name='question', value_name='yes').reset_index()
+        long['report'] = long['row'].map(dict(enumerate(self.reports)))
+        long['verdict'] = np.where(long['yes'], 'yes', 'no')
+        evidence = self.evidence['evidence'].rename('evidence')
+        long = long.merge(evidence, how='left', left_on=['row', 'question'], right_index=True)
+        long['evidence'] = long['evidence'].fillna("")
+        # Report-major order, matching the order reports and questions were asked in
+        long['question_order'] = long['question'].map({question: i for i, question in enumerate(self.questions)})
+        return long.sort_values(['row', 'question_order'], kind='stable')[['row', 'report', 'question', 'verdict', 'evidence']]
@@ -0,0 +1,93 @@
+import os
+import math
+from summarizer import split_into_windows
+
+# Windows per forward pass, window size (the classifier's 512-token limit) and the cap on windows scored per report
+DEFAULT_SENTIMENT_BATCH_SIZE = int(os.environ.get("CYBERINSIGHTS_SENTIMENT_BATCH_SIZE", 16))
+SENTIMENT_WINDOW_TOKENS = 512
+SENTIMENT_WINDOW_OVERLAP = 32
+MAX_SENTIMENT_WINDOWS = int(os.environ.get("CYBERINSIGHTS_SENTIMENT_MAX_WINDOWS", 64))
+
+# Temperature applied to the logits before the softmax. The default 1.0 keeps the model's raw, uncalibrated scores;
+# no fitted value ships, so set one from fit_temperature run on labelled report excerpts
+SENTIMENT_TEMPERATURE = float(os.environ.get("CYBERINSIGHTS_SENTIMENT_TEMPERATURE", 1.0))
+
+
+# Function to pick at most max_windows windows spread evenly over the document
+def sample_windows(windows, max_windows=MAX_SENTIMENT_WINDOWS):
+    if len(windows) <= max_windows:
+        return windows
+    step = len(windows) / max_windows
+    return [windows[int(i * step)] for i in range(max_windows)]
+
+
+# Function to turn logits into per-class scores with temperature scaling
+def tempered_softmax(logits, temperature=SENTIMENT_TEMPERATURE):
+    scaled = [value / temperature for value in logits]
+    top = max(scaled)
+    exps = [math.exp(value - top) for value in scaled]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+# Function to fit the temperature that minimizes the negative log-likelihood of labelled logits (grid search)
+def fit_temperature(logits, labels, candidates=None):
+    candidates = candidates or [round(0.5 + 0.05 * i, 2) for i in range(91)]
+
+    def nll(temperature):
+        return -sum(math.log(max(tempered_softmax(row, temperature)[label], 1e-12)) for row, label in zip(logits, labels))
+
+    return min(candidates, key=nll)
+
+
+# Function to compute the raw logits of many token windows in padded batches
+def score_windows(windows, tokenizer, model, batch_size=DEFAULT_SENTIMENT_BATCH_SIZE):
+    import torch
+
+    logits = []
+    for start in range(0, len(windows), batch_size):
+        batch = [tokenizer.build_inputs_with_special_tokens(ids) for ids in windows[start:start + batch_size]]
+        inputs = tokenizer.pad({'input_ids': batch}, return_tensors='pt')
+        with torch.no_grad():
+            output = model(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask'])
+        logits.extend(output.logits.float().tolist())
+    return logits
+
+
+# Function to classify several documents in one pass: every document's windows share the same batches,
+# and each document's class scores are the token-weighted mean over its windows
+def classify_documents(texts, tokenizer, model, batch_size=DEFAULT_SENTIMENT_BATCH_SIZE, temperature=SENTIMENT_TEMPERATURE):
+    labels = [model.config.id2label[i].lower() for i in range(len(model.config.id2label))]
+    windows, owners = [], []
+    for doc, text in enumerate(texts):
+        token_ids = tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']
+        doc_windows = sample_windows(split_into_windows(token_ids, SENTIMENT_WINDOW_TOKENS, SENTIMENT_WINDOW_OVERLAP))
+        windows.extend(window for window in doc_windows if window)
+        owners.extend(doc for window in doc_windows if window)
+
+    # Sorting by length keeps padding within each batch small
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+    logits = score_windows([windows[i] for i in order], tokenizer, model, batch_size)
+
+    totals = [[0.0] * len(labels) for _ in texts]
+    weights = [0] * len(texts)
+    for i, row in zip(order, logits):
+        scores = tempered_softmax(row, temperature)
+        weight = len(windows[i])
+        weights[owners[i]] += weight
+        for label, score in enumerate(scores):
+            totals[owners[i]][label] += weight * score
+
+    results = []
+    for total, weight in zip(totals, weights):
+        if not weight:
+            results.append({'label': None, 'scores': {}})
+            continue
+        scores = {label: value / weight for label, value in zip(labels, total)}
+        results.append({'label': max(scores, key=scores.get), 'scores': scores})
+    return results
+
+
+# Function to classify a single document
+def classify_document(text, tokenizer, model, batch_size=DEFAULT_SENTIMENT_BATCH_SIZE, temperature=SENTIMENT_TEMPERATURE):
+    return classify_documents([text], tokenizer, model, batch_size, temperature)[0]
@@ -0,0 +1,81 @@
+import os
+import base64
+import functools
+from io import BytesIO
+from PIL import Image
+
+# Directory Streamlit serves at app/static/ when server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+
+# Image shown at the bottom of the genai1/genai3 sidebars
+SIDEBAR_IMAGE = os.environ.get(
+    "CYBERINSIGHTS_SIDEBAR_IMAGE",
+    'E:\\Adarsh\\AI\\ChatwithPDF\\CHAT_WITH_PDF\\Files\\photo_2024-10-09_01-13-06-Vy0Uc9P2e-transformed.png'
+)
+
+BACKGROUND_MAX_WIDTH = 1920
+ICON_MAX_WIDTH = 800
+SIDEBAR_MAX_WIDTH = 600
+
+
+# Function to return a file's mtime, used as part of every cache key so edited images are re-encoded
+def _mtime(path):
+    return os.stat(path).st_mtime_ns
+
+
+# Function to resize an image to at most max_width and re-encode it compactly (JPEG if opaque, optimized PNG otherwise)
+@functools.lru_cache(maxsize=32)
+def _compress_image(path, mtime, max_width):
+    with Image.open(path) as img:
+        img.load()
+        if img.width > max_width:
+            img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+        buffered = BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(buffered, format="PNG", optimize=True)
+            return buffered.getvalue(), "png"
+        img.convert("RGB").save(buffered, format="JPEG", quality=85, optimize=True, progressive=True)
+        return buffered.getvalue(), "jpeg"
+
+
+# Function to return the compressed image bytes and format, encoded once per file version
+def compressed_image(path, max_width):
+    return _compress_image(path, _mtime(path), max_width)
+
+
+@functools.lru_cache(maxsize=32)
+def _data_uri(path, mtime, max_width):
+    data, fmt = _compress_image(path, mtime, max_width)
+    return f"data:image/{fmt};base64,{base64.b64encode(data).decode()}"
+
+
+# Function to return a small image as a cached base64 data URI for inline HTML
+def image_data_uri(path, max_width=ICON_MAX_WIDTH):
+    return _data_uri(path, _mtime(path), max_width)
+
+
+@functools.lru_cache(maxsize=32)
+def _static_url(path, mtime, max_width):
+    data, fmt = _compress_image(path, mtime, max_width)
+    name = f"{os.path.splitext(os.path.basename(path))[0].replace(' ', '_')}_{max_width}_{mtime}.{'jpg' if fmt == 'jpeg' else fmt}"
+    target = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(target):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_path, target)
+    return f"{STATIC_URL}/{name}"
+
+
+# Function to publish a large image (e.g. a page background) under static/ and return its URL
+def static_image_url(path, max_width=BACKGROUND_MAX_WIDTH):
+    return _static_url(path, _mtime(path), max_width)
+
+
+# Function to return the compressed sidebar image, or None when the configured file does not exist
+def sidebar_image(path=SIDEBAR_IMAGE, max_width=SIDEBAR_MAX_WIDTH):
+    if not os.path.exists(path):
+        return None
+    return compressed_image(path, max_width)[0]
@@ -0,0 +1,64 @@
+import os
+from job_runner import NO_PROGRESS
+
+# Generation settings for map-reduce summarization; batch size and beam count trade CPU time for quality
+DEFAULT_BATCH_SIZE = int(os.environ.get("CYBERINSIGHTS_SUMMARY_BATCH_SIZE", 4))
+DEFAULT_NUM_BEAMS = int(os.environ.get("CYBERINSIGHTS_SUMMARY_BEAMS", 4))
+WINDOW_TOKENS = 1024
+WINDOW_OVERLAP = 128
+MAX_REDUCE_DEPTH = 5
+
+
+# Function to split token ids into overlapping windows that fit the model (leaving room for BOS/EOS)
+def split_into_windows(token_ids, window_tokens=WINDOW_TOKENS, overlap=WINDOW_OVERLAP):
+    size = window_tokens - 2
+    if len(token_ids) <= size:
+        return [token_ids]
+    step = size - overlap
+    return [token_ids[start:start + size] for start in range(0, len(token_ids) - overlap, step)]
+
+
+# Function to summarize many token windows in padded batches through model.generate
+def generate_summaries(windows, tokenizer, model, batch_size=DEFAULT_BATCH_SIZE, num_beams=DEFAULT_NUM_BEAMS,
+                       max_length=150, min_length=50, progress=NO_PROGRESS):
+    import torch
+
+    summaries = []
+    for start in range(0, len(windows), batch_size):
+        batch = [tokenizer.build_inputs_with_special_tokens(ids) for ids in windows[start:start + batch_size]]
+        inputs = tokenizer.pad({'input_ids': batch}, return_tensors='pt')
+        with torch.no_grad():
+            summary_ids = model.generate(
+                inputs['input_ids'],
+                attention_mask=inputs['attention_mask'],
+                max_length=max_length,
+                min_length=min_length,
+                length_penalty=2.0,
+                num_beams=num_beams,
+                early_stopping=True
+            )
+        summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+        progress.advance(len(batch))
+    return summaries
+
+
+# Function to summarize a whole document: summarize windows (map), then summarize the summaries (reduce).
+# `progress` gets one step per window summarized, added as each pass starts.
+def summarize_document(text, tokenizer, model, batch_size=DEFAULT_BATCH_SIZE, num_beams=DEFAULT_NUM_BEAMS,
+                       max_length=150, min_length=50, progress=NO_PROGRESS):
+    token_ids = tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']
+
+    for depth in range(MAX_REDUCE_DEPTH):
+        windows = split_into_windows(token_ids)
+        if len(windows) == 1:
+            break
+        progress.add_steps(len(windows))
+        progress.advance(0, message=f"pass {depth + 1}, {len(windows)} windows")
+        partial_summaries = generate_summaries(windows, tokenizer, model, batch_size, num_beams, max_length, min_length, progress)
+        token_ids = tokenizer(" ".join(partial_summaries), add_special_tokens=False, verbose=False)['input_ids']
+
+    # Final pass over a single window (truncated only if the reduce depth ran out)
+    final_window = token_ids[:WINDOW_TOKENS - 2]
+    progress.add_steps(1)
+    progress.advance(0, message="final summary")
+    return generate_summaries([final_window], tokenizer, model, 1, num_beams, max_length, min_length, progress)[0]
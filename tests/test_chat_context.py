@@ -0,0 +1,54 @@
+from chat_context import ChatContextManager
+
+
+def make_history(exchanges):
+    history = []
+    for i in range(exchanges):
+        history.append({'role': 'user', 'content': f"question {i} " + "word " * 40})
+        history.append({'role': 'assistant', 'content': f"answer {i} " + "word " * 40})
+    return history
+
+
+def recording_summarizer(calls):
+    def summarize(previous, turns):
+        calls.append(len(turns))
+        return f"{previous} +{len(turns)}".strip()
+    return summarize
+
+
+def test_building_messages_never_summarizes():
+    calls = []
+    manager = ChatContextManager(recording_summarizer(calls), recent_tokens=100, fold_turns=4)
+    state = {}
+    messages = manager.build_messages(make_history(10), "next?", state)
+    assert calls == []
+    # Nothing is folded yet, so every earlier turn is still sent verbatim
+    assert len(messages) == 21
+
+
+def test_fold_summarizes_overflowed_turns_in_batches():
+    calls = []
+    manager = ChatContextManager(recording_summarizer(calls), recent_tokens=100, fold_turns=4)
+    state = {}
+    history = []
+    for exchange in make_history(10):
+        history.append(exchange)
+        if exchange['role'] == 'assistant':
+            manager.fold(history, state)
+    assert calls and all(count >= 4 for count in calls)
+    assert len(calls) < 10
+
+    messages = manager.build_messages(history, "next?", state)
+    assert messages[0]['content'].startswith("Summary of the earlier conversation")
+    sent = [message for message in messages[1:-1]]
+    assert len(sent) == len(history) - state['chat_summary_upto']
+
+
+def test_cleared_history_resets_the_summary():
+    calls = []
+    manager = ChatContextManager(recording_summarizer(calls), recent_tokens=100, fold_turns=2)
+    state = {}
+    manager.fold(make_history(10), state)
+    assert state['chat_summary']
+    messages = manager.build_messages([], "hello", state)
+    assert messages == [{'role': 'user', 'content': 'hello'}]
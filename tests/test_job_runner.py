@@ -0,0 +1,70 @@
+import threading
+from job_runner import JobRunner, DONE, FAILED
+
+
+def test_identical_inputs_share_one_job_and_report_progress():
+    release = threading.Event()
+    calls = []
+
+    def work(value, progress):
+        calls.append(value)
+        progress.add_steps(2, report='a.pdf')
+        release.wait(5)
+        progress.advance(2, report='a.pdf', message='done')
+        return value * 2
+
+    runner = JobRunner(max_workers=2)
+    first = runner.submit('double', [21], work, 21, session='s1')
+    second = runner.submit('double', [21], work, 21, session='s2')
+    assert first is second
+    release.set()
+    first.future.result(5)
+
+    assert first.status == DONE and first.result == 42
+    assert calls == [21]
+    assert first.report_progress() == {'a.pdf': (2, 2)}
+    assert runner.session_job('s2', 'double') is first
+    runner.release('s2', 'double')
+    assert runner.session_job('s2', 'double') is None
+
+
+def test_failed_jobs_restart_only_on_request():
+    attempts = []
+
+    def flaky(progress):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    runner = JobRunner(max_workers=1)
+    job = runner.submit('flaky', [], flaky, session='s1')
+    job.future.result(5)
+    assert job.status == FAILED and str(job.error) == "boom"
+    assert runner.submit('flaky', [], flaky, session='s1') is job
+
+    retry = runner.submit('flaky', [], flaky, session='s1', restart_failed=True)
+    retry.future.result(5)
+    assert retry is not job and retry.status == DONE and retry.result == "ok"
+
+
+def test_a_queued_job_nobody_waits_for_is_dropped():
+    release = threading.Event()
+    runner = JobRunner(max_workers=1)
+    busy = runner.submit('busy', [], lambda progress: release.wait(5), session='s1')
+    queued = runner.submit('count', [1], lambda progress: 1, session='s2')
+    runner.release('s2', 'count')
+    release.set()
+    busy.future.result(5)
+
+    assert queued.future.cancelled()
+    assert runner.submit('count', [1], lambda progress: 1, session='s2') is not queued
+
+
+def test_finished_jobs_expire_after_the_ttl():
+    runner = JobRunner(max_workers=1, ttl=0)
+    job = runner.submit('answer', [], lambda progress: 42, session='s1')
+    job.future.result(5)
+    rerun = runner.submit('answer', [], lambda progress: 42, session='s1')
+    rerun.future.result(5)
+    assert rerun is not job and rerun.result == 42
@@ -0,0 +1,19 @@
+from pdf_export import ChatPdfExporter
+
+
+def test_exports_again_after_the_history_grows():
+    exporter = ChatPdfExporter(font_path=None)
+    history = [{'role': 'user', 'content': 'Is MFA enforced? ✓'}, {'role': 'assistant', 'content': 'Yes.'}]
+    first = exporter.render(history)
+    history.append({'role': 'user', 'content': 'Which systems are out of scope?'})
+    second = exporter.render(history)
+    assert first.startswith(b'%PDF') and second.startswith(b'%PDF')
+    assert second != first
+    assert exporter.render(history) is second
+
+
+def test_rewritten_history_is_exported_again():
+    exporter = ChatPdfExporter(font_path=None)
+    first = exporter.render([{'role': 'user', 'content': 'first'}])
+    second = exporter.render([{'role': 'user', 'content': 'other'}])
+    assert second.startswith(b'%PDF') and second is not first
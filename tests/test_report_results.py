@@ -0,0 +1,121 @@
+import hashlib
+import pytest
+
+# genai3 is a Streamlit page; these tests only run where the app's dependencies are installed
+for module in ('streamlit', 'plotly', 'openai', 'requests'):
+    pytest.importorskip(module)
+
+import genai3
+
+TEXTS = {
+    'a': "Alpha audit. A breach of the payroll system was contained within a day.",
+    'b': "Bravo audit. Firewall misconfiguration was found on two edge routers.",
+}
+
+
+class Upload:
+    """Stand-in for a Streamlit UploadedFile; every upload has its own file_id, like in the app."""
+
+    def __init__(self, name, key, file_id):
+        self.name = name
+        self.key = key
+        self.file_id = file_id
+
+
+class StubExecutor:
+    """Answers every question 'yes' and records the questions it was asked."""
+
+    def __init__(self):
+        self.asked = []
+
+    def map(self, requests, on_done=None):
+        responses = []
+        for index, request in enumerate(requests):
+            prompt = request['messages'][0]['content']
+            self.asked.append(prompt.split("'")[1])
+            responses.append({'choices': [{'message': {'content': "yes, the report covers it."}}]})
+            if on_done:
+                on_done(index)
+        return responses
+
+
+class MemoryCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def put(self, key, value):
+        self.values[key] = value
+        return value
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    loads = []
+
+    def load_documents(files, progress=None):
+        loads.extend(file.name for file in files)
+        return [{'doc_id': hashlib.sha256(TEXTS[file.key].encode()).hexdigest(), 'text': TEXTS[file.key],
+                 'page_offsets': [0]} for file in files]
+
+    monkeypatch.setattr(genai3, 'load_documents', load_documents)
+    monkeypatch.setattr(genai3, 'answer_cache', MemoryCache())
+    return loads
+
+
+def update(state, files, questions, executor):
+    return genai3.update_report_results(state, files, questions, executor=executor, batched=False)
+
+
+def test_adding_a_report_only_reads_and_asks_about_the_new_one(loaded):
+    state, executor = {}, StubExecutor()
+    a, b = Upload('a.pdf', 'a', 'id-a'), Upload('b.pdf', 'b', 'id-b')
+    update(state, [a], ['q1', 'q2'], executor)
+    executor.asked.clear()
+    detailed_results, total_risks, analysis_results, _ = update(state, [a, b], ['q1', 'q2'], executor)
+
+    assert loaded == ['a.pdf', 'b.pdf']
+    assert executor.asked == ['q1', 'q2']
+    assert [row['Risk Level'] for row in detailed_results] == ['High', 'Medium']
+    assert total_risks == {'Low': 0, 'Medium': 1, 'High': 1, 'No Risk Detected': 0}
+    assert analysis_results.answers_for('q2').tolist() == [True, True]
+
+
+def test_removing_a_report_drops_its_results_and_risk_count(loaded):
+    state, executor = {}, StubExecutor()
+    a, b = Upload('a.pdf', 'a', 'id-a'), Upload('b.pdf', 'b', 'id-b')
+    update(state, [a, b], ['q1'], executor)
+    executor.asked.clear()
+    detailed_results, total_risks, _, _ = update(state, [a], ['q1'], executor)
+
+    assert executor.asked == []
+    assert [row['PDF Name'] for row in detailed_results] == ['a.pdf']
+    assert total_risks == {'Low': 0, 'Medium': 0, 'High': 1, 'No Risk Detected': 0}
+    assert len(state['reports']) == 1 and list(state['upload_doc_ids']) == ['id-a']
+
+
+def test_duplicate_uploads_are_analyzed_once_but_counted_twice(loaded):
+    state, executor = {}, StubExecutor()
+    first, copy = Upload('a.pdf', 'a', 'id-1'), Upload('a copy.pdf', 'a', 'id-2')
+    detailed_results, total_risks, analysis_results, _ = update(state, [first, copy], ['q1'], executor)
+
+    assert executor.asked == ['q1']
+    assert [row['PDF Name'] for row in detailed_results] == ['a.pdf', 'a copy.pdf']
+    assert total_risks['High'] == 2
+    assert analysis_results.answers_for('q1').tolist() == [True, True]
+
+
+def test_a_new_question_is_only_asked_once_per_report(loaded):
+    state, executor = {}, StubExecutor()
+    a, b = Upload('a.pdf', 'a', 'id-a'), Upload('b.pdf', 'b', 'id-b')
+    update(state, [a, b], ['q1'], executor)
+    loaded.clear()
+    executor.asked.clear()
+    _, total_risks, analysis_results, _ = update(state, [a, b], ['q1', 'custom'], executor)
+
+    assert executor.asked == ['custom', 'custom']
+    assert loaded == ['a.pdf', 'b.pdf']  # the text is read again (from the document store) to ask it
+    assert total_risks == {'Low': 0, 'Medium': 1, 'High': 1, 'No Risk Detected': 0}
+    assert analysis_results.answers_for('custom').tolist() == [True, True]
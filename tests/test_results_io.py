@@ -0,0 +1,23 @@
+from results_io import analysis_to_rows, rows_to_analysis
+from results_matrix import ResultsMatrix
+
+
+def test_round_trip_keeps_a_question_answered_no_everywhere():
+    matrix = ResultsMatrix.from_answers(['a.pdf', 'b.pdf'], ['q1', 'q2'], [
+        (0, 'q1', 'yes', 'from a'),
+        (1, 'q1', 'no', ''),
+        (0, 'q2', 'no', ''),
+        (1, 'q2', 'no', ''),
+    ])
+    detailed_results = [
+        {'PDF Name': 'a.pdf', 'Risk Level': 'High', 'High Hits': 2, 'Medium Hits': 0, 'Low Hits': 0},
+        {'PDF Name': 'b.pdf', 'Risk Level': 'No Risk Detected', 'High Hits': 0, 'Medium Hits': 0, 'Low Hits': 0},
+    ]
+    rows = analysis_to_rows(matrix, detailed_results, ['doc-a', 'doc-b'])
+
+    _, total_risks, results, file_names, questions = rows_to_analysis(rows)
+    assert file_names == ['a.pdf', 'b.pdf']
+    assert questions == ['q1', 'q2']
+    assert total_risks['High'] == 1
+    assert results.evidence_for('q1')['evidence'].tolist() == ['from a']
+    assert results.evidence_for('q2').empty
@@ -0,0 +1,31 @@
+from results_matrix import ResultsMatrix
+
+
+def test_evidence_for_returns_yes_answers_in_report_order():
+    matrix = ResultsMatrix.from_answers(['a.pdf', 'b.pdf'], ['q1'], [
+        (1, 'q1', 'yes', 'from b'),
+        (0, 'q1', 'yes', 'from a'),
+    ])
+    evidence = matrix.evidence_for('q1')
+    assert list(evidence.columns) == ['row', 'report', 'evidence']
+    assert evidence['report'].tolist() == ['a.pdf', 'b.pdf']
+    assert evidence['evidence'].tolist() == ['from a', 'from b']
+
+
+def test_evidence_for_question_answered_no_everywhere_is_empty():
+    matrix = ResultsMatrix.from_answers(['a.pdf', 'b.pdf'], ['q1', 'q2'], [
+        (0, 'q1', 'yes', 'from a'),
+        (0, 'q2', 'no', ''),
+        (1, 'q2', 'no', ''),
+    ])
+    evidence = matrix.evidence_for('q2')
+    assert evidence.empty
+    assert list(evidence.columns) == ['row', 'report', 'evidence']
+    assert not matrix.answers_for('q2').any()
+
+
+def test_evidence_for_without_any_yes_answers_is_empty():
+    matrix = ResultsMatrix.from_answers(['a.pdf'], ['q1'], [(0, 'q1', 'no', '')])
+    evidence = matrix.evidence_for('q1')
+    assert evidence.empty
+    assert list(evidence.columns) == ['row', 'report', 'evidence']
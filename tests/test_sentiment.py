@@ -0,0 +1,15 @@
+from sentiment import tempered_softmax, fit_temperature
+
+
+def test_tempered_softmax_flattens_scores_as_temperature_rises():
+    sharp = tempered_softmax([2.0, 0.0, -1.0], 1.0)
+    flat = tempered_softmax([2.0, 0.0, -1.0], 3.0)
+    assert abs(sum(flat) - 1.0) < 1e-9
+    assert flat[0] < sharp[0]
+
+
+def test_fit_temperature_softens_overconfident_logits():
+    # The model is confidently right half the time and confidently wrong the other half
+    logits = [[4.0, 0.0, 0.0]] * 10
+    labels = [0] * 5 + [1] * 5
+    assert fit_temperature(logits, labels) > 1.0
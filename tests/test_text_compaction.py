@@ -0,0 +1,38 @@
+from text_compaction import compact_pages
+
+BODY = [
+    ("Access reviews were performed quarterly for privileged accounts.", "Dormant accounts are disabled automatically."),
+    ("Backups are encrypted and restoration is tested twice a year.", "Offsite copies are kept in a separate region."),
+    ("Vendor risk assessments cover all critical suppliers.", "Contracts include breach notification clauses."),
+    ("Security awareness training completion reached most staff.", "Phishing simulations are run every month."),
+]
+
+
+def audit_page(number, middle, footer):
+    first, last = BODY[number - 1]
+    return "\n".join(["ACME Corp Audit Report", first, *middle, last, footer])
+
+
+def test_numbers_in_a_findings_table_are_kept():
+    page = "Critical\n3\nHigh\n12\nYear\n2023"
+    assert compact_pages([page]) == [page]
+
+
+def test_table_values_survive_on_pages_with_page_number_footers():
+    table = ["Severity", "Critical", "3", "High", "12", "Year", "2023"]
+    pages = [audit_page(n, table if n == 1 else [], str(n)) for n in range(1, 5)]
+    assert compact_pages(pages)[0] == "\n".join([BODY[0][0], *table, BODY[0][1]])
+
+
+def test_page_number_footers_are_removed():
+    pages = [audit_page(n, [], f"Page {n} of 4") for n in range(1, 5)]
+    assert compact_pages(pages) == ["\n".join(body) for body in BODY]
+
+
+def test_a_lone_page_number_footer_is_removed_without_repetition():
+    assert compact_pages(["Scope and methodology.\nPage 7 of 40"]) == ["Scope and methodology."]
+
+
+def test_hyphenated_line_breaks_keep_the_hyphen():
+    page = "Access requires multi-\nfactor authentication for all staff."
+    assert compact_pages([page]) == ["Access requires multi-factor authentication for all staff."]
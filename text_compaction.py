@@ -0,0 +1,91 @@
+import re
+from collections import Counter
+
+# A line (ignoring digits) on at least this share of pages is treated as a running header/footer
+REPEATED_LINE_RATIO = 0.5
+# Header/footer detection needs enough pages to tell boilerplate from content
+MIN_PAGES_FOR_REPEATS = 3
+# Only short lines among the first/last few non-empty lines of a page are header/footer candidates
+MAX_BOILERPLATE_CHARS = 150
+EDGE_LINES = 3
+# Paragraphs shorter than this are never deduplicated (e.g. "Yes", table cells)
+MIN_DEDUPE_CHARS = 40
+
+PAGE_NUMBER_LINE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+# A word split across lines at a hyphen. The hyphen is kept when rejoining: without a dictionary a
+# wrapped "cyber-\nsecurity" cannot be told apart from a real compound such as "multi-\nfactor".
+HYPHENATED_BREAK = re.compile(r"([a-z])-\n([a-z])")
+INLINE_WHITESPACE = re.compile(r"[ \t\f\v ]+")
+BLANK_LINES = re.compile(r"\n{3,}")
+DIGITS = re.compile(r"\d+")
+
+
+# Function to collapse runs of spaces and tabs within a line
+def normalize_line(line):
+    return INLINE_WHITESPACE.sub(" ", line).strip()
+
+
+# Function to key a line so that "Page 3 of 40" and "Page 4 of 40" count as the same line
+def line_signature(line):
+    return DIGITS.sub("#", line.lower())
+
+
+# Function to return the lines at the top and bottom of a page, where running headers and footers sit
+def edge_lines(lines):
+    lines = [line for line in lines if line]
+    return lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+
+
+# Function to return the positions of the first and last non-empty lines of a page, where page numbers sit
+def outer_positions(lines):
+    positions = [i for i, line in enumerate(lines) if line]
+    return {positions[0], positions[-1]} if positions else set()
+
+
+# Function to decide whether a line is a page number or a running header/footer. Page numbers must be the
+# first or last line, and a bare number must also recur there across pages, so table cells, counts and
+# years in the body are kept.
+def is_boilerplate(line, position, edges, outer, repeated):
+    if PAGE_NUMBER_LINE.match(line):
+        return position in outer and (not line.isdigit() or line_signature(line) in repeated)
+    return line in edges and line_signature(line) in repeated
+
+
+# Function to find the signatures of header/footer lines that repeat across most pages
+def find_repeated_lines(pages, min_ratio=REPEATED_LINE_RATIO):
+    if len(pages) < MIN_PAGES_FOR_REPEATS:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({line_signature(line) for line in edge_lines(page) if len(line) <= MAX_BOILERPLATE_CHARS})
+    threshold = max(2, min_ratio * len(pages))
+    return {signature for signature, count in counts.items() if count >= threshold}
+
+
+# Function to strip running headers, footers and page numbers, repair hyphenation and
+# drop repeated paragraphs, returning one cleaned string per page. `pages` may be a generator,
+# so a caller extracting pages lazily never holds the raw text of more than one page.
+def compact_pages(pages):
+    page_lines = [[normalize_line(line) for line in page.splitlines()] for page in pages]
+    repeated = find_repeated_lines(page_lines)
+
+    seen_paragraphs = set()
+    compacted = []
+    for i, lines in enumerate(page_lines):
+        page_lines[i] = None  # each page's lines are dropped once it is compacted
+        edges = set(edge_lines(lines))
+        outer = outer_positions(lines)
+        kept = [line for position, line in enumerate(lines) if not is_boilerplate(line, position, edges, outer, repeated)]
+        text = HYPHENATED_BREAK.sub(r"\1-\2", "\n".join(kept))
+        paragraphs = []
+        for paragraph in BLANK_LINES.sub("\n\n", text).split("\n\n"):
+            paragraph = paragraph.strip("\n")
+            key = paragraph.lower()
+            if len(paragraph) >= MIN_DEDUPE_CHARS:
+                if key in seen_paragraphs:
+                    continue
+                seen_paragraphs.add(key)
+            if paragraph:
+                paragraphs.append(paragraph)
+        compacted.append("\n\n".join(paragraphs))
+    return compacted